@@ -0,0 +1,73 @@
+"""
+Shared Chat Model for LangChain Chains
+
+Every chain in this package talks to the same OpenAI model with the same settings,
+so they share one ChatOpenAI instance instead of each module building its own
+client, tokenizer cache and callback wiring. The instance is created lazily on
+first use and reused for the lifetime of the process.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict
+import os
+
+from langchain_openai import ChatOpenAI
+
+from graph.chains.prompt_cache import prompt_cache_logger
+from services.openai_http import http_async_client, http_client
+
+
+# Configure OpenAI model from environment variable with fallback to gpt-4o-mini
+# This allows easy switching between different AI models for different use cases
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
+# Optional smaller model for the CSV planner, which only reshapes already-extracted JSON
+# Vision-dependent steps (schema inference, data capture) always use OPENAI_MODEL
+PLANNING_MODEL = os.getenv("PLANNING_MODEL") or OPENAI_MODEL
+
+# Optional OpenAI processing tier (e.g. "priority" for lower latency, "flex" for cheaper batch work)
+# Unset means the parameter is not sent and the project's default tier applies; setting it
+# needs a langchain-openai release that has the ChatOpenAI service_tier field
+OPENAI_SERVICE_TIER = os.getenv("OPENAI_SERVICE_TIER") or None
+
+
+@lru_cache(maxsize=None)
+def get_llm(model: str = OPENAI_MODEL) -> ChatOpenAI:
+    """
+    Get the shared ChatOpenAI instance for a model.
+    
+    Chains that use the same model share one instance.
+    
+    Args:
+        model: OpenAI model name (default: OPENAI_MODEL)
+    
+    Returns:
+        ChatOpenAI: Deterministic (temperature=0) chat model on the shared HTTP pool
+    """
+    # service_tier is only passed when configured: langchain-openai 0.1.x has no such field
+    tier_options = {"service_tier": OPENAI_SERVICE_TIER} if OPENAI_SERVICE_TIER else {}
+    return ChatOpenAI(
+        model=model,
+        temperature=0,
+        callbacks=[prompt_cache_logger],
+        http_client=http_client,
+        http_async_client=http_async_client,
+        **tier_options,
+    )
+
+
+def prompt_cache_options(cache_key: str) -> Dict[str, Any]:
+    """
+    Bind options that route a chain's calls to one OpenAI prompt cache.
+    
+    prompt_cache_key is sent in the request body via extra_body rather than as a
+    keyword argument: only recent openai / langchain-openai releases accept the
+    keyword, while extra_body is passed through by every supported version.
+    
+    Args:
+        cache_key: Stable key shared by every call with the same static prompt prefix
+    
+    Returns:
+        Dict[str, Any]: Keyword arguments for ChatOpenAI.bind()
+    """
+    return {"extra_body": {"prompt_cache_key": cache_key}}
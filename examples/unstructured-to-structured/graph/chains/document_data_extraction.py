@@ -20,27 +20,34 @@ Key Features:
 - Multilingual support through semantic similarity
 """
 
-from typing import List, Optional
+from typing import Any, Dict, Final, List, Optional
 from pydantic import BaseModel, Field
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.output_parsers import JsonOutputParser
-from langchain_core.runnables import RunnableSequence
-from langchain_openai import ChatOpenAI
-from dotenv import load_dotenv
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableLambda, RunnableSequence
+from functools import lru_cache
+import asyncio
 import os
 
-# Load environment variables from .env file
-load_dotenv()
+from graph.chains._llm import OPENAI_MODEL, get_llm, prompt_cache_options
+from services import json_codec
 
-# Configure OpenAI model from environment variable with fallback to gpt-4o-mini
-# This allows easy switching between different AI models for different use cases
-OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-llm = ChatOpenAI(model=OPENAI_MODEL, temperature=0)
+
+# Maximum number of extraction calls in flight at once, to stay within provider rate limits
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+
+# Shared chat model (OPENAI_MODEL is re-exported for cache keys in the data capture node)
+llm = get_llm()
+
+# JSON mode guarantees every mapping response is a single valid JSON object
+# prompt_cache_key routes every mapping call to the same provider cache, so the shared
+# system + schema prefix keeps hitting OpenAI's prompt cache across concurrent requests
+json_llm = llm.bind(response_format={"type": "json_object"}, **prompt_cache_options("document-mapping"))
 
 
 # System prompt that defines the AI's role and behavior for document mapping
 # This prompt emphasizes visual analysis, schema adherence, and value normalization
-mapping_system = """
+# It is a Final constant so the request prefix stays byte-stable for provider-side prompt caching
+mapping_system: Final[str] = """
 You are a robust multimodal (vision + text) document-to-schema mapping system. Given an inferred schema and a document (image/pdf/text), analyze layout and visual structure first, then map fields strictly to the provided schema.
 
 Requirements:
@@ -54,7 +61,8 @@ Requirements:
 
 # User template that provides the schema and mapping instructions
 # This template ensures consistent input format and clear output requirements
-user_template = """
+# The schema is stable for a whole session, so it belongs to the cacheable prefix as well
+user_template: Final[str] = """
 Schema (JSON):
 {schema_json}
 
@@ -63,21 +71,88 @@ Map the following document to the schema. Keep the schema's section/field names.
 Normalize when possible (dates to ISO-8601, numbers without locale separators, emails lowercased, trim whitespace, unify currencies/units if indicated by context).
 """
 
-# Create the complete prompt template combining system instructions, user template, and dynamic messages
-# MessagesPlaceholder allows insertion of actual document content (images, text, etc.)
-mapping_prompt = ChatPromptTemplate.from_messages([
-    ("system", mapping_system),  # AI's role and behavior
-    ("user", user_template),     # Schema and mapping instructions
-    MessagesPlaceholder("messages"),  # Dynamic document content
-])
+# User template for batched extraction of several small text documents in one call
+# The system prompt is shared with the single-document template so both keep the same cached prefix
+batch_user_template: Final[str] = """
+Schema (JSON):
+{schema_json}
+
+You will receive several documents, each introduced by a line "=== DOC <id>: <name> ===".
+Map every document to the schema independently; never mix values between documents. Keep the schema's section/field names. For each field output an object:
+{{"value": <any|null>, "normalized_value": <any|null>, "reason": <string>, "confidence": <number optional>}}.
+Normalize when possible (dates to ISO-8601, numbers without locale separators, emails lowercased, trim whitespace, unify currencies/units if indicated by context).
+Return ONLY a JSON object of the form {{"documents": {{"<id>": <schema-mapped object>}}}} with exactly one entry per document id.
+"""
+
+# The system prompt has no variables, so it is rendered once into a static SystemMessage
+# The prompt template then reuses it as-is instead of re-formatting the text on every call
+mapping_system_message = SystemMessage(content=mapping_system.format())
+
+@lru_cache(maxsize=32)
+def _schema_user_message(template: str, schema_json: str) -> HumanMessage:
+    """Format a user template with the schema once; every document of a session reuses the message."""
+    return HumanMessage(content=template.format_map({"schema_json": schema_json}))
+
+
+def _render_mapping_messages(inputs: Dict[str, Any]) -> List[BaseMessage]:
+    """Build the single-document mapping messages without a prompt template parse per call."""
+    return [mapping_system_message, _schema_user_message(user_template, inputs["schema_json"]), *inputs["messages"]]
+
+
+def _render_batch_mapping_messages(inputs: Dict[str, Any]) -> List[BaseMessage]:
+    """Build the batched mapping messages without a prompt template parse per call."""
+    return [mapping_system_message, _schema_user_message(batch_user_template, inputs["schema_json"]), *inputs["messages"]]
+
+
+# Prompt combining system instructions, user template, and dynamic messages
+# The dynamic document content (images, text, etc.) is appended after the static messages
+# Static content comes first and per-document content last, so repeat calls share a cached prefix
+mapping_prompt = RunnableLambda(_render_mapping_messages)
+
+def _parse_json_response(message: AIMessage) -> Any:
+    """Decode a JSON-mode response (the content is always a single JSON object); wide integers stay exact."""
+    return json_codec.loads(message.content)
+
 
 # JSON output parser to ensure structured output format
-# This guarantees that the AI response is valid JSON that can be processed programmatically
-parser = JsonOutputParser()
+# JSON mode already guarantees valid JSON, so the content is decoded directly (orjson unless
+# the response holds integers too wide for it)
+parser = RunnableLambda(_parse_json_response)
 
 # Public chain export that processes documents and returns structured data
 # This chain combines the prompt template, AI model, and JSON parser
-document_data_extractor: RunnableSequence = mapping_prompt | llm | parser
+document_data_extractor: RunnableSequence = mapping_prompt | json_llm | parser
+
+# Batched variant that maps several small text documents per LLM call
+# Amortizes the network round-trip and the system/schema prompt tokens across the batch
+batch_mapping_prompt = RunnableLambda(_render_batch_mapping_messages)
+document_batch_extractor: RunnableSequence = batch_mapping_prompt | json_llm | parser
+
+
+async def ainvoke_all(chain: RunnableSequence, inputs: List[Dict[str, Any]], max_concurrency: int = LLM_MAX_CONCURRENCY, semaphore: Optional[asyncio.Semaphore] = None) -> List[Any]:
+    """
+    Invoke an extraction chain for several inputs concurrently.
+    
+    The calls are I/O-bound, so they are fired together with asyncio.gather and
+    bounded by a semaphore to respect provider rate limits.
+    
+    Args:
+        chain: Extraction chain to invoke (e.g. document_batch_extractor)
+        inputs: One input dictionary per call
+        max_concurrency: Maximum number of calls in flight at once
+        semaphore: Existing semaphore to share with other calls (overrides max_concurrency)
+        
+    Returns:
+        List[Any]: One result per input, in input order; failed calls return their exception
+    """
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def _invoke(chain_input: Dict[str, Any]) -> Any:
+        async with semaphore:
+            return await chain.ainvoke(chain_input)
+    
+    return await asyncio.gather(*(_invoke(chain_input) for chain_input in inputs), return_exceptions=True)
 
 def get_system_prompt() -> str:
     """
@@ -102,3 +177,13 @@ def get_user_prompt() -> str:
         str: The user template that defines the input format and output requirements
     """
     return user_template
+
+
+def get_batch_user_prompt() -> str:
+    """
+    Get the batched user template for external use (e.g., tracking, debugging, or logging).
+    
+    Returns:
+        str: The user template used when several documents are mapped in one call
+    """
+    return batch_user_template
@@ -23,20 +23,20 @@ Usage:
     validation across different document types.
 """
 
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.messages import AIMessage, BaseMessage, SystemMessage
 from pydantic import BaseModel, Field
-from langchain_core.runnables import RunnableSequence
-from langchain_openai import ChatOpenAI
-from typing import List, Dict, Any, Optional
-from dotenv import load_dotenv
+from langchain_core.runnables import RunnableLambda, RunnableSequence
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from typing import Final, List, Dict, Any, Optional
+from functools import lru_cache
 import os
 
-# Load environment variables from .env file
-load_dotenv()
+from graph.chains._llm import get_llm, prompt_cache_options
+from services import json_codec
 
-# Configure OpenAI model from environment variable with fallback to gpt-4o-mini
-model_name = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-llm = ChatOpenAI(model=model_name, temperature=0)
+
+# Shared chat model used by every chain
+llm = get_llm()
 
 
 class SchemaField(BaseModel):
@@ -93,13 +93,41 @@ class InferredSchema(BaseModel):
     rationale: str = Field(description="Concise explanation of the main signals used to infer this schema")
 
 
-# Configure the LLM to emit structured output matching our Pydantic models
-# This ensures type safety and consistent output format
-structured_llm_schema = llm.with_structured_output(InferredSchema)
+@lru_cache(maxsize=None)
+def _json_schema_response_format(model_cls: type) -> Dict[str, Any]:
+    """
+    Build the native OpenAI JSON-schema response format for a Pydantic model, once per class.
+    
+    The models stay the single source of truth for the output contract, but the response is
+    decoded straight into plain dicts: the node only needs JSON, so building and validating
+    a tree of nested Pydantic objects (then dumping it back to dicts) is skipped.
+    
+    Args:
+        model_cls: Pydantic model describing the expected output
+        
+    Returns:
+        Dict[str, Any]: response_format payload constraining the model output to the schema
+    """
+    function = convert_to_openai_tool(model_cls)["function"]
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": function["name"],
+            "description": function["description"],
+            "schema": function["parameters"],
+        },
+    }
+
+
+def _parse_schema_response(message: AIMessage) -> Dict[str, Any]:
+    """Decode the JSON-schema constrained response in a single pass; wide integers stay exact."""
+    return json_codec.loads(message.content)
+
 
 # System prompt that instructs the AI model on how to generate schemas
 # The prompt emphasizes document-driven inference and consistent formatting
-system = """
+# It is a Final constant so the request prefix stays byte-stable for provider-side prompt caching
+system: Final[str] = """
 You are a senior information architect. Given multiple heterogeneous documents (any type, any language), infer the most appropriate, general JSON schema that can represent them.
 
 Guidance:
@@ -114,18 +142,61 @@ Guidance:
  - For each field, add a short 'reason' explaining the signals used to infer the field (keywords, repeated labels, table headers, layout proximity, visual grouping, etc.).
 """
 
-# Create prompt template combining system instructions with user input
-# MessagesPlaceholder allows dynamic insertion of document content
-schema_prompt = ChatPromptTemplate.from_messages(
-    [
-        ("system", system),
-        MessagesPlaceholder("messages"),
-    ]
-)
-
-# Create the complete schema inference chain
-# This chain processes documents through the prompt and returns structured schemas
-schema_inferencer: RunnableSequence = schema_prompt | structured_llm_schema
+# The system prompt has no variables, so it is rendered once into a static SystemMessage
+system_message = SystemMessage(content=system.format())
+
+def _render_schema_messages(inputs: Dict[str, Any]) -> List[BaseMessage]:
+    """Prepend the pre-rendered system prompt to the multimodal document messages."""
+    return [system_message, *inputs["messages"]]
+
+
+# Prompt combining system instructions with the document messages
+# The multimodal messages are passed through as-is, like a MessagesPlaceholder, without
+# running the prompt template machinery on every call
+schema_prompt = RunnableLambda(_render_schema_messages)
+
+# Opt-in Pydantic validation of every inferred schema, for debugging model output
+# The default path trusts the provider's JSON-schema constrained output and skips it
+SCHEMA_STRICT_VALIDATION = os.getenv("SCHEMA_STRICT_VALIDATION", "0") == "1"
+
+
+def _validate_inferred_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate an inferred schema against the Pydantic models and return it as plain JSON."""
+    return InferredSchema.model_validate(schema).model_dump()
+
+
+@lru_cache(maxsize=None)
+def _build_schema_inferencer() -> RunnableSequence:
+    """
+    Build the complete schema inference chain on first use.
+    
+    Generating the JSON schema of the nested Pydantic models is the most expensive part of
+    importing this module, so it is deferred until the chain is first needed and then reused
+    for the life of the process (worker reloads that never run inference skip it entirely).
+    
+    Returns:
+        RunnableSequence: prompt -> JSON-schema constrained LLM -> dict (-> optional validation)
+    """
+    # Native OpenAI JSON-schema response format: the model output is constrained to the schema
+    # and arrives as a single JSON document in the message content
+    # prompt_cache_key keeps schema inference calls on the same provider prompt cache
+    json_schema_llm = llm.bind(
+        response_format=_json_schema_response_format(InferredSchema),
+        **prompt_cache_options("schema-inference"),
+    )
+    chain = schema_prompt | json_schema_llm | RunnableLambda(_parse_schema_response)
+    if SCHEMA_STRICT_VALIDATION:
+        chain = chain | RunnableLambda(_validate_inferred_schema)
+    return chain
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve the lazily built public attributes of this module (PEP 562)."""
+    # Public chain export that processes documents through the prompt and returns structured schemas
+    if name == "schema_inferencer":
+        return _build_schema_inferencer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 def get_system_prompt() -> str:
     """
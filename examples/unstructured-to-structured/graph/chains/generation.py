@@ -28,23 +28,21 @@ Use Cases:
 - Data preparation for machine learning and analytics workflows
 """
 
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnableSequence
-from langchain_openai import ChatOpenAI
-from dotenv import load_dotenv
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableLambda, RunnableSequence
+from typing import Any, Dict, Final, List
 import os
 
-# Load environment variables from .env file
-load_dotenv()
+from graph.chains._llm import PLANNING_MODEL, get_llm, prompt_cache_options
+from services import json_codec
 
-# Configure OpenAI model from environment variable with fallback to gpt-4o-mini
-# This allows easy switching between different AI models for different use cases
-model_name = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-llm = ChatOpenAI(model=model_name, temperature=0)
 
-# System prompt that defines the AI's role and behavior for data shaping
-# This prompt emphasizes data analysis, value extraction, and table organization
-system = """You are a data shaping assistant.
+# Shared chat model for the planning model (OPENAI_MODEL unless PLANNING_MODEL is set)
+llm = get_llm(PLANNING_MODEL)
+
+# Original, verbose system prompt for data shaping
+# Kept for debugging and prompt comparisons; enable it with VERBOSE_PROMPTS=1
+system_verbose: Final[str] = """You are a data shaping assistant.
 
 You are given a set of JSON documents with the same schema (same keys & depth).
 
@@ -105,9 +103,31 @@ data_dict = {{
 
 The LLM must extract the actual values from the documents and populate these lists, don't invent values."""
 
+# Compact system prompt with the same rules, stated once each
+# The planner input is the largest prompt in the pipeline, so fewer prefill tokens cut
+# both latency and cost on every call
+system_compact: Final[str] = """You are a data shaping assistant. You receive JSON documents that share one schema (same keys and depth).
+
+Create 1..N CSV tables that together contain ALL the values in the documents, based on the structure you actually find, not on assumptions.
+
+Rules:
+- For each field use "normalized_value" when it is present and not empty, otherwise "value"; output the plain string/number, never the field object.
+- Omit every 'reason' and 'confidence' value.
+- Use clear lower_snake_case table and column names and group related fields; put arrays in their own tables and flatten or split nested objects as appropriate.
+- The first table is always "general", an overview of all documents.
+- Never invent values.
+
+Return a JSON object of the form:
+{{"tables": [{{"name": "general", "description": "Overview of all documents", "data_dict": {{"column_name": ["value1", "value2"], "another_column": ["value1", "value2"]}}}}]}}
+Each data_dict maps column names to lists of values with one entry per row."""
+
+# System prompt that defines the AI's role and behavior for data shaping
+# It is a Final constant so the request prefix stays byte-stable for provider-side prompt caching
+system: Final[str] = system_verbose if os.getenv("VERBOSE_PROMPTS", "0") == "1" else system_compact
+
 # User template that provides the documents for analysis
 # This template ensures consistent input format and clear output requirements
-user = """
+user: Final[str] = """
 Analyze these documents and create CSV tables with structured data:
 
 Documents:
@@ -116,16 +136,24 @@ Documents:
 Return only the JSON with the table structure and data_dict for each table.
 """
 
-# Create the complete prompt template combining system instructions and user input
-# This template guides the AI through the data shaping process
-generation_prompt = ChatPromptTemplate.from_messages([
-    ("system", system),  # AI's role and data shaping rules
-    ("user", user),      # Document input and output requirements
-])
+# The system prompt has no variables, so it is rendered once into a static SystemMessage
+# Only the short user template is formatted per call
+system_message = SystemMessage(content=system.format())
+
+def _render_generation_messages(inputs: Dict[str, Any]) -> List[BaseMessage]:
+    """Build the planner messages: the pre-rendered system prompt plus the formatted user template."""
+    return [system_message, HumanMessage(content=user.format_map(inputs))]
+
+
+# Prompt combining system instructions and user input
+# A plain format_map on the short user template replaces the prompt template machinery
+generation_prompt = RunnableLambda(_render_generation_messages)
 
 # Public chain export that processes documents and returns structured table plans
 # This chain combines the prompt template with the AI model for data shaping
-csv_generation_planner: RunnableSequence = generation_prompt | llm
+# JSON mode guarantees the response is a single valid JSON object (no prose or code fences)
+# prompt_cache_key keeps planner calls on the same provider prompt cache for the static system prefix
+csv_generation_planner: RunnableSequence = generation_prompt | llm.bind(response_format={"type": "json_object"}, **prompt_cache_options("csv-planning"))
 
 def get_system_prompt() -> str:
     """
@@ -150,3 +178,51 @@ def get_user_prompt() -> str:
         str: The user template that defines the input format and output requirements
     """
     return user
+
+
+# Keys of an extracted field object ({"value", "normalized_value", "reason", "confidence"})
+_FIELD_KEYS = frozenset(("value", "normalized_value", "reason", "confidence"))
+# Per-field metadata the planner is told to omit from every table
+_OMITTED_KEYS = frozenset(("reason", "confidence"))
+
+
+def _planning_view(data: Any) -> Any:
+    """
+    Reduce extracted data to the values the planner puts in its tables.
+    
+    Each field object collapses to its normalized_value when present and not empty,
+    otherwise its value, and 'reason'/'confidence' entries are dropped. These are the
+    planner's own extraction rules applied up front, so its tables are unchanged
+    while the reasons (most of the inventory's tokens) are never sent.
+    """
+    if isinstance(data, dict):
+        if "value" in data and data.keys() <= _FIELD_KEYS:
+            normalized = data.get("normalized_value")
+            return _planning_view(data["value"] if normalized is None or normalized == "" else normalized)
+        # A schema field that happens to be named "reason" is still a field object (a dict) and is kept
+        return {key: _planning_view(value) for key, value in data.items() if key not in _OMITTED_KEYS or isinstance(value, dict)}
+    if isinstance(data, list):
+        return [_planning_view(item) for item in data]
+    return data
+
+
+def render_inventory(documents: List[Dict[str, Any]]) -> str:
+    """
+    Render the documents inventory for the user prompt.
+    
+    All documents are planned together in a single call, so the system prompt is
+    paid once per session. Each document is serialized as one line of compact JSON,
+    which is valid JSON for the model and fewer tokens than the Python repr
+    the prompt template would otherwise produce. Field objects are reduced to their
+    final values first (see _planning_view).
+    
+    Args:
+        documents: List of {"filename": ..., "data": ...} entries
+        
+    Returns:
+        str: Numbered inventory, one document per line
+    """
+    return "\n".join(
+        f"[{index}] {json_codec.dumps({**document, 'data': _planning_view(document.get('data'))}).decode('utf-8')}"
+        for index, document in enumerate(documents, start=1)
+    )
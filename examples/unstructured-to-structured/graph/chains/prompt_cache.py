@@ -0,0 +1,37 @@
+"""
+Prompt Cache Monitoring for LangChain Chains
+
+OpenAI automatically caches prompt prefixes of 1024 tokens or more, as long as the
+prefix is byte-for-byte identical between requests. Every chain in this package
+therefore keeps its static system prompt (and any per-session content such as the
+schema) ahead of the per-document messages.
+
+This module provides a callback handler that logs how many prompt tokens were
+served from the provider cache, so the hit rate can be verified in the server logs.
+"""
+
+import logging
+from typing import Any
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+logger = logging.getLogger(__name__)
+
+
+class PromptCacheUsageLogger(BaseCallbackHandler):
+    """Log cached vs. total prompt tokens reported for each LLM call."""
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if not usage:
+                    continue
+                input_tokens = usage.get("input_tokens", 0)
+                cached_tokens = (usage.get("input_token_details") or {}).get("cache_read", 0)
+                logger.info(f"🧠 Prompt cache: {cached_tokens}/{input_tokens} prompt tokens served from cache")
+
+
+# Shared handler instance attached to every ChatOpenAI client
+prompt_cache_logger = PromptCacheUsageLogger()
@@ -2,3 +2,18 @@ INFERENCE_SCHEMA = "inference_squema"
 DOCUMENT_DATA_CAPTURE = "document_data_capture"
 GENERATE_CSV = "generate_csv"
 
+
+# Supported document file types, hoisted to module scope so per-file checks are
+# a single set/dict lookup instead of rebuilding extension lists on every call
+IMAGE_EXTENSIONS = frozenset({".png", ".jpg", ".jpeg", ".gif", ".bmp"})
+PDF_EXTENSION = ".pdf"
+BINARY_EXTENSIONS = IMAGE_EXTENSIONS | {PDF_EXTENSION}
+
+# MIME types used when building image data URLs
+IMAGE_MIME_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".bmp": "image/bmp",
+}
@@ -15,14 +15,11 @@ the shared GraphState, allowing for seamless data passing and error handling.
 
 Architecture:
 - StateGraph: Manages workflow state and transitions
-- MemorySaver: Provides checkpointing for workflow persistence
+- No checkpointer: each request runs the three stages once, end to end
 - Nodes: Individual processing units with specific responsibilities
 - Edges: Define the flow and dependencies between processing stages
 """
 
-from dotenv import load_dotenv
-from langgraph.checkpoint.memory import MemorySaver
-# from langgraph.checkpoint.sqlite import SqliteSaver
 from langgraph.graph import END, StateGraph
 
 from graph.consts import INFERENCE_SCHEMA, DOCUMENT_DATA_CAPTURE, GENERATE_CSV
@@ -32,10 +29,6 @@ from graph.nodes.generate_csv import generate_csv
 from graph.state import GraphState
 
 
-# Load environment variables (API keys, configuration)
-load_dotenv()
-
-
 # Initialize the main workflow graph using StateGraph
 # StateGraph manages the state transitions and data flow between nodes
 workflow = StateGraph(GraphState)
@@ -59,6 +52,9 @@ workflow.add_edge(GENERATE_CSV, END)                       # CSV generation →
 
 # Compile the workflow into an executable application
 # This creates the final workflow that can be invoked with input data
+# No checkpointer is attached: a run is never resumed, and checkpointing would copy the
+# whole state (including the image data URLs in `document_data_urls`) at every edge.
+# If persistence is added later, keep only paths/hashes in the checkpointed state.
 app = workflow.compile()
 
 # Optional: Generate a visual representation of the workflow graph
@@ -25,74 +25,347 @@ Processing Flow:
 6. Tracking and monitoring integration
 """
 
-from typing import Any, Dict
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+import asyncio
+import hashlib
+import logging
+import mimetypes
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 import os
-import json
+import stat
+import orjson
+import numpy as np
 from pathlib import Path
-import base64
 from langchain_core.messages import HumanMessage
-from graph.chains.document_data_extraction import document_data_extractor
+from graph.chains.document_data_extraction import document_data_extractor, document_batch_extractor, ainvoke_all, LLM_MAX_CONCURRENCY, OPENAI_MODEL
+from graph.consts import BINARY_EXTENSIONS, IMAGE_EXTENSIONS, IMAGE_MIME_TYPES, PDF_EXTENSION
 from graph.state import GraphState
 
 # Get system and user prompts from the chain
-from graph.chains.document_data_extraction import get_system_prompt, get_user_prompt
+from graph.chains.document_data_extraction import get_batch_user_prompt, get_system_prompt, get_user_prompt
 
 # Handit.ai
-from services.handit_service import tracker
+from services.handit_service import submit_tracking, tracker
+from services import json_codec
 
-def read_document_content(file_path: str) -> str:
+# OpenAI Files API uploads for PDFs
+from services.openai_files import get_file_id
+from services.data_url import to_data_url
+
+# Deterministic fast path for small "label: value" text documents
+from services.direct_extraction import DirectExtractor
+
+# Exact-match and semantic LLM response caches
+from services.llm_cache import response_cache
+from services.semantic_cache import semantic_cache
+
+# Per-document progress is logged at DEBUG, so concurrent documents don't contend on stdout
+logger = logging.getLogger(__name__)
+
+# Small text documents are packed into a single LLM call to amortize round-trips and prompt tokens
+BATCH_MAX_DOCUMENT_BYTES = int(os.getenv("DOC_BATCH_MAX_DOCUMENT_BYTES", "16384"))
+BATCH_MAX_TOTAL_CHARS = int(os.getenv("DOC_BATCH_MAX_TOTAL_CHARS", "80000"))
+BATCH_MAX_DOCUMENTS = int(os.getenv("DOC_BATCH_MAX_DOCUMENTS", "8"))
+
+# Documents processed concurrently; each holds its bytes and prompt in memory while in flight
+DOC_CONCURRENCY = int(os.getenv("DOC_CONCURRENCY", "16"))
+
+# Handit.ai receives a small reference per document instead of megabyte-scale data URLs,
+# unless full documents are requested; text documents keep a preview of this many characters
+TRACK_FULL_DOCUMENTS = os.getenv("HANDIT_TRACK_FULL_DOCUMENTS", "0") == "1"
+TRACK_TEXT_PREVIEW_CHARS = 4096
+
+
+def _session_cache_namespace(schema_json_text: str) -> str:
+    """
+    Digest everything about a mapping request that is fixed for a whole session.
+    
+    Model, prompts and schema (several KB) are hashed once per session instead of
+    once per document; the digest then prefixes every per-document cache key and
+    scopes the semantic cache.
+    """
+    return response_cache.make_key(OPENAI_MODEL, get_system_prompt(), get_user_prompt(), schema_json_text)
+
+
+def _response_cache_key(session_namespace: str, extension: str, document_digest: str) -> str:
+    """
+    Build the exact-match cache key for a document extraction.
+    
+    The key covers everything that determines the (temperature=0) output:
+    the session namespace (model, prompts, schema) and the sha256 of the raw document bytes.
+    """
+    return response_cache.make_key(session_namespace, extension, document_digest)
+
+
+def _read_document(file_path: Path) -> Tuple[bytes, str]:
+    """Read a document and hash its bytes once; the digest keys the cache and identifies it in tracking."""
+    document_bytes = file_path.read_bytes()
+    return document_bytes, hashlib.sha256(document_bytes).hexdigest()
+
+
+def _schema_section_names(schema_json: Any) -> FrozenSet[str]:
+    """Collect every section name of an inferred schema (common and specialized sections)."""
+    if not isinstance(schema_json, dict):
+        return frozenset()
+    sections = list(schema_json.get("common_sections") or [])
+    for specialized in (schema_json.get("specialized_sections") or {}).values():
+        sections.extend(specialized or [])
+    return frozenset(section["name"] for section in sections if isinstance(section, dict) and "name" in section)
+
+
+def _matches_schema(extraction_result: Any, section_names: FrozenSet[str]) -> bool:
     """
-    Read document content for vLLM processing.
+    Cheap structural check of an extraction result against the inferred schema.
     
-    This function handles different file types and converts them to appropriate
-    formats for AI processing. Images are converted to base64 data URLs,
-    PDFs are marked for future processing, and text files are read directly.
+    A result must be a JSON object that maps at least one schema section to an
+    object. Missing fields are allowed (the LLM reports them as null), but a reply
+    that shares nothing with the schema is rejected before it is cached, written
+    or passed to CSV generation.
+    """
+    if not isinstance(extraction_result, dict):
+        return False
+    if not section_names:
+        return True
+    present = section_names.intersection(extraction_result)
+    return bool(present) and all(isinstance(extraction_result[name], dict) for name in present)
+
+
+def _collect_batch_candidates(document_paths: List[str], session_namespace: str, direct_extractor: DirectExtractor) -> Tuple[List[Tuple[str, str]], Dict[str, List[str]]]:
+    """
+    Read and filter the documents eligible for batched extraction.
+    
+    Runs in a worker thread: it reads every small text document from disk, so it
+    must not block the event loop.
     
     Args:
-        file_path: Path to the document file to be processed
+        document_paths: Paths of all documents in the session
+        session_namespace: Session digest from _session_cache_namespace, for cache keys
+        direct_extractor: Fast path; documents it can map are not eligible
         
     Returns:
-        str: Processed content ready for AI analysis
+        Tuple[List[Tuple[str, str]], Dict[str, List[str]]]: (document path, decoded text) of
+        every eligible document with distinct content, and the paths of identical copies
+        keyed by the path of the document that represents them
+    """
+    candidates = []
+    # Content hash (cache key) -> path of the first document with that content
+    representatives: Dict[str, str] = {}
+    duplicates: Dict[str, List[str]] = {}
+    for document_path in document_paths:
+        file_path = Path(document_path)
+        extension = file_path.suffix.lower()
+        if extension in BINARY_EXTENSIONS:
+            continue
+        # One stat call answers both "is it a regular file" and "is it small enough"
+        try:
+            file_stat = file_path.stat()
+        except OSError:
+            continue
+        if not stat.S_ISREG(file_stat.st_mode) or file_stat.st_size > BATCH_MAX_DOCUMENT_BYTES:
+            continue
+        document_bytes, document_digest = _read_document(file_path)
+        if not document_bytes or document_bytes.isspace():
+            continue
+        cache_key = _response_cache_key(session_namespace, extension, document_digest)
+        if response_cache.get(cache_key) is not None:
+            continue
+        # Identical copies are sent once and share the representative's result
+        if (representative := representatives.get(cache_key)) is not None:
+            duplicates[representative].append(document_path)
+            continue
+        try:
+            text = document_bytes.decode("utf-8")
+        except UnicodeDecodeError:
+            continue
+        if direct_extractor.extract(text) is not None:
+            continue
+        representatives[cache_key] = document_path
+        duplicates[document_path] = []
+        candidates.append((document_path, text))
+    
+    return candidates, duplicates
+
+
+def _pack_batches(candidates: List[Tuple[str, str]]) -> List[List[Tuple[str, str]]]:
+    """
+    Pack small text documents into batches, several documents per LLM call.
+    
+    Candidates (from _collect_batch_candidates) are sorted by length and packed
+    greedily into batches bounded by BATCH_MAX_TOTAL_CHARS and BATCH_MAX_DOCUMENTS,
+    so every batch holds similarly sized documents. Images and PDFs always keep the
+    single-document path.
+    
+    Args:
+        candidates: (document path, decoded text) of every eligible document
         
-    Supported Formats:
-        - Images: PNG, JPG, JPEG, GIF, BMP (converted to base64)
-        - PDFs: Marked for future processing
-        - Text: Direct content reading with encoding fallbacks
-        - Binary: Error markers for unsupported formats
+    Returns:
+        List[List[Tuple[str, str]]]: Batches of at least two documents each
     """
-    file_path = Path(file_path)
-    extension = file_path.suffix.lower()
+    # Bin by length before packing, so each batch holds documents of similar size:
+    # a single long document no longer stalls a call full of short ones, and the
+    # concurrent batch calls finish at roughly the same time
+    candidates.sort(key=lambda candidate: len(candidate[1]))
     
-    if extension in ['.png', '.jpg', '.jpeg', '.gif', '.bmp']:
-        # For images, read as base64 for vLLM vision processing
-        try:
-            with open(file_path, 'rb') as f:
-                image_bytes = f.read()
-                # Encode as base64 string for AI vision models
-                base64_string = base64.b64encode(image_bytes).decode('utf-8')
-                return f"data:image/{extension[1:]};base64,{base64_string}"
-        except Exception as e:
-            print(f"❌ Error reading image file {file_path}: {str(e)}")
-            return f"[ERROR_READING_IMAGE: {file_path.name}] - {str(e)}"
+    # Pack candidates greedily into batches
+    batches: List[List[tuple]] = []
+    current: List[tuple] = []
+    current_chars = 0
+    for document_path, text in candidates:
+        if current and (len(current) >= BATCH_MAX_DOCUMENTS or current_chars + len(text) > BATCH_MAX_TOTAL_CHARS):
+            batches.append(current)
+            current, current_chars = [], 0
+        current.append((document_path, text))
+        current_chars += len(text)
+    if current:
+        batches.append(current)
     
-    elif extension == '.pdf':
-        # For PDFs, mark for future processing (could be extended to convert pages to images)
-        return f"[PDF_FILE: {file_path.name}] - PDF processing required"
+    # A batch of one gains nothing over the single-document path
+    return [batch for batch in batches if len(batch) >= 2]
+
+
+async def _extract_batches(batches: List[List[Tuple[str, str]]], duplicates: Dict[str, List[str]], schema_json_text: str, section_names: FrozenSet[str], llm_semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    """
+    Run the batched extraction calls for the batches from _pack_batches.
     
-    else:
-        # For text files, read directly with encoding fallbacks
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except UnicodeDecodeError:
-            try:
-                # Try binary mode for other binary files
-                with open(file_path, 'rb') as f:
-                    return f"[BINARY_FILE: {file_path.name}] - Binary file, cannot extract text"
-            except Exception as e:
-                return f"[ERROR_READING_FILE: {file_path.name}] - {str(e)}"
+    Identical documents are sent once and share one result. The node runs this as a
+    task alongside the single-document extractions, so only batched documents wait
+    for it.
+    
+    Args:
+        batches: Batches of (document path, decoded text)
+        duplicates: Paths of identical copies keyed by the path of their representative
+        schema_json_text: Serialized inferred schema for the mapping prompt
+        section_names: Section names of the inferred schema, to check each result
+        llm_semaphore: Semaphore shared with the single-document calls, bounding all LLM calls together
+        
+    Returns:
+        Dict[str, Any]: Extraction results keyed by document path. Documents that are
+        missing from the result (the batch failed, or their result did not match the
+        schema) are processed individually by the caller.
+    """
+    if not batches:
+        return {}
+    
+    batch_inputs = []
+    for batch in batches:
+        blocks = [
+            f"=== DOC {doc_id}: {Path(document_path).name} ===\n{text}"
+            for doc_id, (document_path, text) in enumerate(batch, start=1)
+        ]
+        message = HumanMessage(content="Map each of the following documents to the provided schema. Analyze layout first, use synonyms/semantic similarity; include reasons.\n\n" + "\n\n".join(blocks))
+        batch_inputs.append({"messages": [message], "schema_json": schema_json_text})
+    
+    # Run all batch calls concurrently instead of one after another
+    logger.info("📦 Extracting %d small text documents in %d batched calls...", sum(len(batch) for batch in batches), len(batches))
+    batch_results = await ainvoke_all(document_batch_extractor, batch_inputs, semaphore=llm_semaphore)
+    
+    results: Dict[str, Any] = {}
+    for batch, batch_result in zip(batches, batch_results):
+        if isinstance(batch_result, Exception):
+            # Fall back to the single-document path for every document in this batch
+            logger.error("❌ Batch extraction failed, processing documents individually: %s", batch_result)
+            continue
+        
+        documents = batch_result.get("documents", {}) if isinstance(batch_result, dict) else {}
+        for doc_id, (document_path, _) in enumerate(batch, start=1):
+            extraction = documents.get(str(doc_id))
+            if _matches_schema(extraction, section_names):
+                for result_path in (document_path, *duplicates[document_path]):
+                    results[result_path] = extraction
+    
+    return results
+
+# Background writer for structured JSON outputs, so disk writes never wait in line behind LLM calls
+_JSON_WRITE_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="json-writer")
+
+
+@dataclass
+class _PendingWrite:
+    """A structured JSON output queued on the background writer."""
+
+    # Explicit __slots__ keeps one small fixed-layout record per document (no per-instance dict)
+    __slots__ = ("index", "output_path", "future")
+    index: int
+    output_path: Path
+    future: Future
+
+
+def _write_json(output_path: Path, result_dict: Dict[str, Any]) -> None:
+    """Save structured data to a JSON file with proper formatting."""
+    # orjson serializes straight to UTF-8 bytes, so no intermediate str is built
+    # (json_codec falls back to json for integers wider than 64 bits, keeping them exact)
+    with open(output_path, 'wb') as f:
+        f.write(json_codec.dumps(result_dict, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+
+
+# Common instruction for all document types, shared by every message builder
+MAPPING_PREFACE = "Map the document to the provided schema. Analyze layout first, use synonyms/semantic similarity; include reasons."
+_PREFACE_BLOCK = {"type": "text", "text": MAPPING_PREFACE}
+
+
+def _decode_document_text(extension: str, document_bytes: bytes) -> Optional[str]:
+    """Decode a text document; images, PDFs and undecodable files have no text."""
+    if extension in BINARY_EXTENSIONS:
+        return None
+    try:
+        return document_bytes.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+
+
+def _image_messages(data_url: str) -> List[HumanMessage]:
+    """Build a multimodal message combining the preface with an image data URL."""
+    return [HumanMessage(content=[_PREFACE_BLOCK, {"type": "image_url", "image_url": {"url": data_url}}])]
+
+
+def _build_pdf_messages(file_path: Path, document_bytes: bytes) -> List[HumanMessage]:
+    """Reference the PDF uploaded to OpenAI, or fall back to a name marker when uploads are disabled."""
+    logger.debug("📄 PDF file detected: %s", file_path.name)
+    file_id = get_file_id(str(file_path), document_bytes)
+    if file_id:
+        return [HumanMessage(content=[_PREFACE_BLOCK, {"type": "file", "file": {"file_id": file_id}}])]
+    return [HumanMessage(content="".join((MAPPING_PREFACE, "\n\n[PDF_FILE] ", file_path.name)))]
+
 
-def document_data_capture(state: GraphState) -> Dict[str, Any]:
+def _text_messages(file_path: Path, document_text: Optional[str]) -> List[HumanMessage]:
+    """Build a text message with the decoded content; undecodable files get a binary marker."""
+    if document_text is None:
+        marker = f"[BINARY_FILE: {file_path.name}] - Binary file, cannot extract text"
+        return [HumanMessage(content="".join(("Extract data using the system rules and schema.\n\nDocument name: ", file_path.name, "\n\nContent:\n", marker)))]
+    logger.debug("📄 Text file detected: %s", file_path.name)
+    return [HumanMessage(content="".join((MAPPING_PREFACE, "\n\nDocument name: ", file_path.name, "\n\nContent:\n", document_text)))]
+
+
+def _prepare_document(file_path: Path, document_bytes: bytes, document_text: Optional[str], data_url: Optional[str]) -> List[HumanMessage]:
+    """
+    Build the mapping messages for one document from bytes that were read once.
+    
+    Only called when no cheaper tier (direct, caches, batch) answered the document,
+    so image encoding and Files API uploads are only paid for real LLM calls. A data
+    URL already built by schema inference is reused instead of re-encoding the image.
+    
+    Args:
+        file_path: Path of the document; its extension selects the message type
+        document_bytes: Raw document bytes
+        document_text: Decoded text from _decode_document_text (text documents only)
+        data_url: Image data URL from schema inference, if any
+        
+    Returns:
+        List[HumanMessage]: The mapping messages for the extraction chain
+    """
+    extension = file_path.suffix.lower()
+    if extension in IMAGE_EXTENSIONS:
+        logger.debug("🖼️ Image file detected: %s", file_path.name)
+        return _image_messages(data_url or to_data_url(IMAGE_MIME_TYPES[extension], document_bytes))
+    
+    # PDFs may upload to the OpenAI Files API; every other extension is a text document
+    if extension == PDF_EXTENSION:
+        return _build_pdf_messages(file_path, document_bytes)
+    return _text_messages(file_path, document_text)
+
+
+async def document_data_capture(state: GraphState) -> Dict[str, Any]:
     """
     Main node function to capture structured data from any type of documents.
     
@@ -110,13 +383,13 @@ def document_data_capture(state: GraphState) -> Dict[str, Any]:
         state: GraphState containing session information, document paths, and inferred schema
         
     Returns:
-        Dict[str, Any]: Updated state with structured JSON paths and any processing errors
+        Dict[str, Any]: State update (merged by LangGraph) with structured JSON paths and any processing errors
         
     Raises:
         Exception: Various exceptions during file processing or AI extraction
                  (all caught and handled gracefully with error logging)
     """
-    print("🔄 Starting document data capture...")
+    logger.info("🔄 Starting document data capture...")
     
     # Extract session and document information from state
     session_id = state.get("session_id")
@@ -128,9 +401,8 @@ def document_data_capture(state: GraphState) -> Dict[str, Any]:
     
     # Validate that documents are provided for processing
     if not document_paths:
-        print("⚠️ No documents found to process")
+        logger.warning("⚠️ No documents found to process")
         return {
-            **state,
             "structured_json_paths": [],
             "errors": state.get("errors", []) + ["No documents found to process"],
         }
@@ -139,19 +411,19 @@ def document_data_capture(state: GraphState) -> Dict[str, Any]:
     # This organizes outputs by session for better file management
     structured_dir = Path(f"assets/structured/{session_id}")
     structured_dir.mkdir(parents=True, exist_ok=True)
-    print(f"📁 Created structured directory: {structured_dir}")
+    logger.debug("📁 Created structured directory: %s", structured_dir)
     
     # Initialize tracking variables for processing results
     structured_json_paths = []
     processing_errors = []
+    pending_writes: List[_PendingWrite] = []
     
     # Retrieve and validate the inferred schema from previous processing stage
     # The schema is required to drive the field mapping process
     inferred_schema = state.get("inferred_schema")
     if not inferred_schema:
-        print("❌ Missing inferred_schema in state; cannot perform mapping.")
+        logger.error("❌ Missing inferred_schema in state; cannot perform mapping.")
         return {
-            **state,
             "structured_json_paths": [],
             "errors": state.get("errors", []) + ["Missing inferred_schema in state"],
         }
@@ -162,83 +434,176 @@ def document_data_capture(state: GraphState) -> Dict[str, Any]:
         schema_json = inferred_schema.model_dump() if hasattr(inferred_schema, "model_dump") else inferred_schema
     except Exception:
         schema_json = inferred_schema
-    schema_json_text = json.dumps(schema_json, ensure_ascii=False)
+    # orjson emits compact UTF-8 in one C call (fewer prompt tokens than json.dumps' ", " separators)
+    schema_json_text = orjson.dumps(schema_json, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+    # Hash the session-stable part of every request once; cache keys and semantic cache
+    # entries are only comparable under the same model, prompts and schema
+    session_namespace = _session_cache_namespace(schema_json_text)
+
+    # Prompts are invariant for the whole run; resolve them once for every tracking payload
+    system_prompt = get_system_prompt()
+    user_prompt = get_user_prompt()
+    batch_user_prompt = get_batch_user_prompt()
+
+    # Image data URLs encoded by the schema inference node for this session
+    document_data_urls = state.get("document_data_urls") or {}
+
+    # Section names used to check every LLM result, collected once for this schema
+    section_names = _schema_section_names(schema_json)
 
-    # Process each document in the provided list
-    for i, document_path in enumerate(document_paths):
+    # Compile the deterministic "label: value" extractor once for this schema
+    direct_extractor = DirectExtractor(schema_json)
+
+    # Bound all LLM calls (batched and single-document), so concurrent documents stay within provider rate limits
+    llm_semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    
+    # Extract small text documents several at a time; the rest go through the per-document loop
+    # Only the local reads and packing are awaited here; the batch calls run as a task alongside
+    # the single-document extractions, and only batched documents wait for it
+    candidates, duplicates = await asyncio.to_thread(_collect_batch_candidates, document_paths, session_namespace, direct_extractor)
+    batches = _pack_batches(candidates)
+    batched_paths = {
+        path
+        for batch in batches
+        for document_path, _ in batch
+        for path in (document_path, *duplicates[document_path])
+    }
+    batch_task = asyncio.ensure_future(_extract_batches(batches, duplicates, schema_json_text, section_names, llm_semaphore))
+
+    # Bound the documents in flight, so a large upload never has every document body loaded at once
+    document_semaphore = asyncio.Semaphore(DOC_CONCURRENCY)
+    
+    # LLM extractions started in this session, keyed by response cache key (content hash)
+    inflight_extractions: Dict[str, asyncio.Future] = {}
+    
+    async def _invoke_extractor(file_path: Path, document_bytes: bytes, document_text: Optional[str], data_url: Optional[str], cache_key: str, document_embedding: Optional[np.ndarray]) -> Any:
+        """Build the messages for one document, run the extraction chain and store the result in both caches."""
+        # Base64 encoding and Files API uploads may take a while, so this runs off the event loop
+        messages = await asyncio.to_thread(_prepare_document, file_path, document_bytes, document_text, data_url)
+        
+        # Call the document data extraction chain with multimodal messages and schema
+        # This is the core AI processing step that maps document content to structured fields
+        async with llm_semaphore:
+            extraction_result = await document_data_extractor.ainvoke({"messages": messages, "schema_json": schema_json_text})
+        # Reject replies that don't follow the schema before they are cached or written
+        if not _matches_schema(extraction_result, section_names):
+            raise ValueError("Extraction result does not match any section of the inferred schema")
+        response_cache.set(cache_key, extraction_result)
+        semantic_cache.store(session_namespace, document_embedding, extraction_result)
+        return extraction_result
+
+    async def _process_document(i: int, document_path: str) -> Tuple[Optional[_PendingWrite], Optional[str]]:
+        """Resolve one document through the extraction tiers; returns its queued write or an error message."""
+        if document_path in batched_paths:
+            # Batched documents wait for their batch outside the document semaphore; a failed
+            # batch task leaves them to the single-document path
+            try:
+                await batch_task
+            except Exception as e:
+                logger.error("❌ Batch extraction failed, processing documents individually: %s", e)
+        async with document_semaphore:
+            return await _resolve_document(i, document_path)
+    
+    def _batched_result(document_path: str) -> Optional[Any]:
+        """Result of a document from the (finished) batch task, or None."""
+        if document_path not in batched_paths or not batch_task.done() or batch_task.cancelled() or batch_task.exception() is not None:
+            return None
+        return batch_task.result().get(document_path)
+    
+    async def _resolve_document(i: int, document_path: str) -> Tuple[Optional[_PendingWrite], Optional[str]]:
+        """Run the extraction tiers for one document (called under the document semaphore)."""
         try:
-            print(f"\n🔄 Processing document {i+1}/{len(document_paths)}: {Path(document_path).name}")
-            
-            # Validate file existence before processing
-            if not os.path.exists(document_path):
-                error_msg = f"File not found: {document_path}"
-                print(f"❌ {error_msg}")
-                processing_errors.append(error_msg)
-                continue
+            logger.debug("🔄 Processing document %d/%d: %s", i + 1, len(document_paths), document_path)
             
             # Read file content and create multimodal input for AI processing
             file_path = Path(document_path)
             extension = file_path.suffix.lower()
             
-            # Common instruction for all document types
-            preface = "Map the document to the provided schema. Analyze layout first, use synonyms/semantic similarity; include reasons."
+            # Read and hash the document once; the bytes feed the message builder and the digest
+            # both the cache key and the tracking reference
+            # A missing file surfaces from the read itself, so no separate existence check is made
+            # The read runs in a worker thread, overlapping with the other documents' LLM calls
+            try:
+                document_bytes, document_digest = await asyncio.to_thread(_read_document, file_path)
+            except FileNotFoundError:
+                error_msg = f"File not found: {document_path}"
+                logger.error("❌ %s", error_msg)
+                return None, error_msg
+            except Exception as e:
+                error_msg = f"Error reading file {document_path}: {str(e)}"
+                logger.error("❌ %s", error_msg)
+                return None, error_msg
             
-            if extension in ['.png', '.jpg', '.jpeg', '.gif', '.bmp']:
-                # For images, create multimodal input combining text instructions with image data
-                try:
-                    with open(document_path, 'rb') as f:
-                        image_bytes = f.read()
-                    
-                    # Build LangChain multimodal message with text and image content
-                    messages = [
-                        HumanMessage(content=[
-                            {"type": "text", "text": preface},
-                            {"type": "image_url", "image_url": {"url": f"data:image/{extension[1:]};base64,{base64.b64encode(image_bytes).decode('utf-8')}"}},
-                        ])
-                    ]
-                    print(f"🖼️ Image file detected: {extension}")
-                    
-                except Exception as e:
-                    error_msg = f"Error reading image file {document_path}: {str(e)}"
-                    print(f"❌ {error_msg}")
-                    processing_errors.append(error_msg)
-                    continue
-                    
-            elif extension == '.pdf':
-                # PDFs: pass as a marker for future processing
-                # Future enhancement: convert PDF pages to images for processing
-                messages = [HumanMessage(content=f"{preface}\n\n[PDF_FILE] {file_path.name}")]
-                print(f"📄 PDF file detected: {extension}")
-            else:
-                # For text files, read content directly and create text-based messages
-                try:
-                    with open(document_path, 'r', encoding='utf-8') as f:
-                        text = f.read()
-                    # Build text message with document content
-                    messages = [HumanMessage(content=f"{preface}\n\nDocument name: {file_path.name}\n\nContent:\n{text}")]
-                    print(f"📄 Text file detected: {extension}")
-                    
-                except UnicodeDecodeError:
-                    try:
-                        # Try binary mode for other binary files
-                        with open(document_path, 'rb') as f:
-                            text = f"[BINARY_FILE: {file_path.name}] - Binary file, cannot extract text"
-                        messages = [HumanMessage(content=f"Extract data using the system rules and schema.\n\nDocument name: {file_path.name}\n\nContent:\n{text}")]
-                    except Exception as e:
-                        error_msg = f"Error reading file {document_path}: {str(e)}"
-                        print(f"❌ {error_msg}")
-                        processing_errors.append(error_msg)
-                        continue
+            # Empty or whitespace-only files carry nothing to map; reject them before any
+            # message building, upload or LLM call
+            if not document_bytes or document_bytes.isspace():
+                error_msg = f"Empty document, nothing to extract: {document_path}"
+                logger.warning("⚠️ %s", error_msg)
+                return None, error_msg
             
-            print(f"📄 Prepared document content for processing")
+            # Only the decoded text is needed to resolve the cheaper tiers; messages (image
+            # encoding, PDF uploads) are built only if the document reaches the LLM
+            document_text = _decode_document_text(extension, document_bytes)
+            document_data_url = document_data_urls.get(document_path)
             
-            print("🤖 Invoking document data extractor...")
+            # Resolve the document through the cheapest tier that can answer it:
+            # deterministic fast path -> exact cache -> batched result -> semantic cache -> LLM
+            cache_key = _response_cache_key(session_namespace, extension, document_digest)
+            # Reference identifying the document in tracking without shipping its content
+            document_ref = {
+                "filename": file_path.name,
+                "sha256": document_digest,
+                "bytes": len(document_bytes),
+                "mime": IMAGE_MIME_TYPES.get(extension) or mimetypes.guess_type(file_path.name)[0],
+            }
+            extraction_result = direct_extractor.extract(document_text) if document_text is not None else None
+            document_embedding = None
+            # The batched template is reported for documents whose result came from a batch call
+            tracked_user_prompt = user_prompt
+            
+            if extraction_result is not None:
+                logger.debug("🎯 Direct extraction - every schema field found on a label line, skipping the LLM")
+            elif (extraction_result := response_cache.get(cache_key)) is not None:
+                logger.debug("⚡ Cache hit - reusing previous extraction result")
+            elif (extraction_result := _batched_result(document_path)) is not None:
+                response_cache.set(cache_key, extraction_result)
+                tracked_user_prompt = batch_user_prompt
+                logger.debug("📦 Using result from batched extraction")
+            elif document_text is not None:
+                # Fall back to the semantic cache for near-duplicate text documents
+                extraction_result, document_embedding = await asyncio.to_thread(semantic_cache.lookup, session_namespace, document_text)
+                if extraction_result is not None:
+                    logger.debug("⚡ Semantic cache hit - reusing extraction result of a near-duplicate document")
+                    response_cache.set(cache_key, extraction_result)
+            
+            extraction_task = None
+            if extraction_result is None:
+                # Identical uploads in the same session (same cache key) share one LLM call:
+                # the first one starts it, the others await the same task
+                extraction_task = inflight_extractions.get(cache_key)
+                if extraction_task is None:
+                    logger.debug("🤖 Invoking document data extractor...")
+                    extraction_task = asyncio.ensure_future(_invoke_extractor(
+                        file_path, document_bytes, document_text, document_data_url, cache_key, document_embedding
+                    ))
+                    inflight_extractions[cache_key] = extraction_task
+                else:
+                    logger.debug("🔁 Identical document already being extracted - sharing its result")
+            
+            # Full-document tracking sends images as data URLs; encode one only in that mode,
+            # when schema inference did not already build it
+            if TRACK_FULL_DOCUMENTS and document_data_url is None and extension in IMAGE_EXTENSIONS:
+                document_data_url = await asyncio.to_thread(to_data_url, IMAGE_MIME_TYPES[extension], document_bytes)
             
-            # Call the document data extraction chain with multimodal messages and schema
-            # This is the core AI processing step that maps document content to structured fields
-            extraction_result = document_data_extractor.invoke({"messages": messages, "schema_json": schema_json_text})
+            # The raw bytes are not needed past this point (the LLM task holds its own
+            # reference until its messages are built); release them before the LLM wait
+            del document_bytes
             
-            print("✅ Document data extraction completed successfully!")
+            if extraction_task is not None:
+                extraction_result = await extraction_task
+                
+                logger.debug("✅ Document data extraction completed successfully!")
             
             # Convert extraction result to dictionary for JSON serialization
             # Handle both raw dictionaries and Pydantic model outputs
@@ -249,55 +614,32 @@ def document_data_capture(state: GraphState) -> Dict[str, Any]:
             output_filename = f"{original_filename}.json"
             output_path = structured_dir / output_filename
             
-            # Save structured data to JSON file with proper formatting
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(result_dict, f, indent=2, ensure_ascii=False)
-            
-            structured_json_paths.append(str(output_path))
-            print(f"💾 Saved structured data to: {output_path}")
-            
-            # Process images for tracking and monitoring purposes
-            # This prepares image data for Handit.ai integration
-            image_attachments = []
-            print(f"🔍 Processing images for document: {Path(document_path).name} (extension: {extension})")
-            
-            if extension in ['.png', '.jpg', '.jpeg', '.gif', '.bmp']:
-                try:
-                    with open(document_path, 'rb') as f:
-                        image_bytes = f.read()
-                    
-                    # Convert to base64 and create data URL (format that Handit.ai expects)
-                    base64_data = base64.b64encode(image_bytes).decode('utf-8')
-                    mime_type = f"image/{extension[1:]}" if extension[1:] != "jpg" else "image/jpeg"
-                    data_url = f"data:{mime_type};base64,{base64_data}"
-                    
-                    image_attachments.append(data_url)
-                    print(f"📸 Added image for tracking: {Path(document_path).name} ({len(data_url)} chars)")
-                    print(f"📸 Image MIME type: {mime_type}")
-                    print(f"📸 Base64 length: {len(base64_data)}")
-                    
-                except Exception as e:
-                    print(f"❌ Error processing image for tracking: {str(e)}")
-            else:
-                print(f"📄 No image processing needed for file type: {extension}")
-            
-            print(f"🖼️ Total images in this cycle: {len(image_attachments)}")
-            print(f"🖼️ Total len of this document: {len(data_url)}")
+            # Save structured data to JSON file in the background
+            # The write overlaps with the other documents' LLM calls and is awaited once all are done
+            pending = _PendingWrite(i, output_path, _JSON_WRITE_POOL.submit(_write_json, output_path, result_dict))
             
             # Prepare tracking input in the correct Handit.ai format
-            # This includes system prompts, user prompts, schema, and document data
+            # This includes system prompts, user prompts, schema, and a document reference
             tracking_input = {
-                "systemPrompt": get_system_prompt(),
-                "userPrompt": get_user_prompt(),
+                "systemPrompt": system_prompt,
+                "userPrompt": tracked_user_prompt,
                 "schema_json": schema_json_text,
-                "document": data_url,
+                "document_ref": document_ref,
             }
             
-            print(f"📤 Sending tracking data to Handit.ai:")
-            print(f"   - Document: {Path(document_path).name}")
+            # Document content for tracking: text documents send a preview by default; with full
+            # documents enabled, images send their data URL (reused from schema inference if built there)
+            if TRACK_FULL_DOCUMENTS:
+                tracking_input["document"] = document_data_url or (document_text if document_text is not None else file_path.name)
+            elif document_text is not None:
+                tracking_input["document"] = document_text[:TRACK_TEXT_PREVIEW_CHARS]
+            
+            logger.debug("📤 Sending tracking data to Handit.ai for document: %s", document_path)
             
             # Track the processing operation with Handit.ai for monitoring and debugging
-            tracker.track_node(
+            # Fire-and-forget: the POST runs on the background tracking thread
+            submit_tracking(
+                 tracker.track_node,
                  input=tracking_input,
                  output=result_dict,
                  node_name="document_data_capture",
@@ -306,26 +648,50 @@ def document_data_capture(state: GraphState) -> Dict[str, Any]:
                  execution_id=execution_id
             )
             
+            return pending, None
+            
         except Exception as e:
             # Comprehensive error handling for any processing failures
             error_msg = f"Error processing document {i+1}: {str(e)}"
-            print(f"❌ {error_msg}")
+            logger.error("❌ %s", error_msg)
+            return None, error_msg
+    
+    # Process every document concurrently: each one waits on a remote LLM call, so the
+    # node takes roughly as long as the slowest document instead of the sum of all of them
+    # gather returns the outcomes in document order, so outputs and errors keep that order
+    document_results = await asyncio.gather(*(_process_document(i, document_path) for i, document_path in enumerate(document_paths)))
+    for pending, error_msg in document_results:
+        if pending is not None:
+            pending_writes.append(pending)
+        if error_msg is not None:
+            processing_errors.append(error_msg)
+    
+    # Wait for the background JSON writes and collect their results in document order
+    for pending in pending_writes:
+        try:
+            await asyncio.wrap_future(pending.future)
+            structured_json_paths.append(str(pending.output_path))
+            logger.debug("💾 Saved structured data to: %s", pending.output_path)
+        except Exception as e:
+            error_msg = f"Error saving structured data for document {pending.index+1}: {str(e)}"
+            logger.error("❌ %s", error_msg)
             processing_errors.append(error_msg)
-            continue
     
     # Generate processing summary and statistics
-    print(f"\n📊 Processing Summary:")
-    print(f"✅ Successfully processed: {len(structured_json_paths)} documents")
-    print(f"❌ Errors encountered: {len(processing_errors)}")
-    print(f"📁 Structured JSON files saved to: {structured_dir}")
+    logger.info(
+        "📊 Processing Summary: ✅ %d documents processed, ❌ %d errors, 📁 saved to %s",
+        len(structured_json_paths), len(processing_errors), structured_dir,
+    )
     
     # Aggregate all processing errors for state management
     all_errors = state.get("errors", []) + processing_errors
     
-    # Return updated state with structured JSON paths and error information
+    # Return the state update with structured JSON paths and error information
     # This allows subsequent nodes to access the processing results
+    # The shared image data URLs have no consumer past this node, so they are released
+    # instead of being carried (and returned) with the final state
     return {
-        **state,
         "structured_json_paths": structured_json_paths,
+        "document_data_urls": {},
         "errors": all_errors
     }
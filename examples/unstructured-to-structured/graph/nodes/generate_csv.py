@@ -29,32 +29,83 @@ Processing Flow:
 6. Track operations and return results
 """
 
-import json
+import asyncio
+import csv
+import itertools
 import logging
+import orjson
+import os
 from pathlib import Path
-from typing import Any, Dict, List
-import pandas as pd
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 from graph.state import GraphState
 from graph.chains.generation import csv_generation_planner
 # Get system and user prompts from the chain
-from graph.chains.generation import get_system_prompt, get_user_prompt
+from graph.chains.generation import get_system_prompt, get_user_prompt, render_inventory
+from graph.chains._llm import PLANNING_MODEL
 # Handit.ai
-from services.handit_service import tracker
+from services.handit_service import submit_tracking, tracker
+from services import json_codec
+
+# Exact-match LLM response cache, shared with the data capture node
+from services.llm_cache import response_cache
 
 logger = logging.getLogger(__name__)
 
+# The planner prompts are static; read them once for cache keys and tracking
+_SYSTEM_PROMPT = get_system_prompt()
+_USER_PROMPT = get_user_prompt()
+
+# Tables written while the plan is still streaming are staged under this extra suffix and
+# only renamed to their final .csv name once the complete plan has been accepted
+_STAGING_SUFFIX = ".partial"
+
+# Background writers for CSV files: tables saved while the planner response is still
+# streaming, and the remaining tables of the final plan, written concurrently
+_CSV_WRITE_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="csv-writer")
+
+
+def _load_json_document(json_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Load one structured JSON file for the planner inventory.
+    
+    Args:
+        json_path: Path to a structured JSON file from data capture
+        
+    Returns:
+        Optional[Dict[str, Any]]: {"filename": ..., "data": ...}, or None if the file could not be loaded
+    """
+    try:
+        with open(json_path, "rb") as f:
+            json_data = json_codec.loads(f.read())
+        
+        filename = Path(json_path).name
+        logger.debug("📄 Loaded complete JSON: %s", filename)
+        return {
+            "filename": filename,
+            "data": json_data
+        }
+        
+    except Exception as e:
+        logger.error(f"❌ Error loading JSON file {json_path}: {e}")
+        return None
+
 
-def _save_tables_to_csv(tables: List[Dict[str, Any]], output_dir: Path) -> List[str]:
+def _save_tables_to_csv(tables: List[Dict[str, Any]], output_dir: Path, file_stems: Optional[List[str]] = None) -> List[str]:
     """
     Save tables to CSV files and return list of generated file paths.
     
-    This function converts the AI-generated table plans into actual CSV files
-    using pandas DataFrame operations. It handles various data structures and
+    This function converts the AI-generated table plans into actual CSV files,
+    writing each column-oriented data_dict row by row with the csv module. Tables
+    are independent, so they are written concurrently on the CSV writer pool;
+    results keep the order of the plan. File names are made unique before the
+    writes fan out, so tables sharing a name never write to the same file. It
     provides comprehensive error handling for each table.
     
     Args:
         tables: List of table dictionaries containing name, description, and data_dict
         output_dir: Directory path where CSV files will be saved
+        file_stems: File name stem per table (default: _table_file_stems(tables))
         
     Returns:
         List[str]: List of file paths for successfully generated CSV files
@@ -65,35 +116,282 @@ def _save_tables_to_csv(tables: List[Dict[str, Any]], output_dir: Path) -> List[
         - description: Human-readable table description
         - data_dict: Dictionary where keys are column names and values are lists of data
     """
-    generated_files = []
+    # map() yields results in submission order, so generated files follow the plan's table order
+    if file_stems is None:
+        file_stems = _table_file_stems(tables)
+    saved_paths = _CSV_WRITE_POOL.map(_save_table, tables, itertools.repeat(output_dir), file_stems)
+    return [csv_path for csv_path in saved_paths if csv_path]
+
+
+def _table_rows(data_dict: Dict[str, Any]) -> Tuple[int, Iterator[tuple]]:
+    """
+    Turn a column-oriented data_dict into CSV rows.
+    
+    List columns must all have the same length (one entry per row); a scalar column
+    holds the same value for every row and is repeated. At least one column must be
+    a list, since scalars alone give no row count.
     
-    for table in tables:
-        table_name = table.get("name", "unknown")
-        data_dict = table.get("data_dict", {})
+    Args:
+        data_dict: Dictionary where keys are column names and values are lists of data
+        
+    Returns:
+        Tuple[int, Iterator[tuple]]: Number of rows and an iterator over them
         
-        if not data_dict:
-            logger.warning(f"⚠️ No data_dict found for table {table_name}")
+    Raises:
+        ValueError: If list columns differ in length or there is no list column
+    """
+    columns = list(data_dict.values())
+    lengths = {len(column) for column in columns if isinstance(column, list)}
+    if len(lengths) > 1:
+        raise ValueError(f"Columns have different numbers of rows: {sorted(lengths)}")
+    if not lengths:
+        raise ValueError("Table has no list column, so its number of rows is unknown")
+    
+    row_count = lengths.pop()
+    return row_count, zip(*(column if isinstance(column, list) else itertools.repeat(column, row_count) for column in columns))
+
+
+def _unique_file_stem(table_name: str, used_stems: Set[str]) -> str:
+    """
+    Pick the CSV file name stem for a table, suffixing repeated names (items, items_2, ...).
+    
+    Stems are assigned in plan order, so the same table sequence always gets the same
+    file names, and no two tables of a plan ever write to the same file.
+    
+    Args:
+        table_name: Name of the table in the plan
+        used_stems: Stems already taken by earlier tables of the plan; updated in place
+        
+    Returns:
+        str: A file stem not used by any earlier table
+    """
+    file_stem, suffix = table_name, 1
+    while file_stem in used_stems:
+        suffix += 1
+        file_stem = f"{table_name}_{suffix}"
+    used_stems.add(file_stem)
+    return file_stem
+
+
+def _table_file_stems(tables: List[Dict[str, Any]]) -> List[str]:
+    """Unique CSV file stem for every table of a plan, in plan order (see _unique_file_stem)."""
+    used_stems: Set[str] = set()
+    return [_unique_file_stem(str(table.get("name", "unknown")), used_stems) for table in tables]
+
+
+def _save_table(table: Dict[str, Any], output_dir: Path, file_stem: Optional[str] = None, staged: bool = False) -> Optional[str]:
+    """
+    Save a single planned table to a CSV file.
+    
+    Args:
+        table: Table dictionary containing name, description, and data_dict
+        output_dir: Directory path where the CSV file will be saved
+        file_stem: File name without extension (default: the table name)
+        staged: Write to "<stem>.csv.partial" instead, to be committed by _commit_streamed_tables
+        
+    Returns:
+        Optional[str]: Path of the generated CSV file, or None if the table was skipped or failed
+    """
+    table_name = table.get("name", "unknown")
+    data_dict = table.get("data_dict", {})
+    
+    if not data_dict:
+        logger.warning(f"⚠️ No data_dict found for table {table_name}")
+        return None
+    
+    try:
+        # data_dict is already column-oriented, so rows are zipped straight from the columns
+        # and written in one pass; no intermediate DataFrame is built
+        row_count, rows = _table_rows(data_dict)
+        
+        # Save rows to CSV file with the table's file stem as filename
+        file_stem = file_stem or table_name
+        csv_path = output_dir / (f"{file_stem}.csv{_STAGING_SUFFIX}" if staged else f"{file_stem}.csv")
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(data_dict.keys())
+            writer.writerows(rows)
+        
+        logger.info(f"💾 Saved CSV: {csv_path} with {row_count} rows and {len(data_dict)} columns")
+        return str(csv_path)
+        
+    except Exception as e:
+        logger.error(f"❌ Error saving table {table_name}: {e}")
+        return None
+
+
+def _commit_streamed_tables(staged_paths: List[Optional[str]], accepted: int) -> List[str]:
+    """
+    Keep the tables written during streaming that belong to the accepted plan.
+    
+    The first `accepted` staged files (the streamed tables that are a prefix of the
+    final plan) are renamed to their final .csv names; every other staged file is
+    deleted, so no CSV of a rejected or partial plan stays in the session directory.
+    
+    Args:
+        staged_paths: Staged file path per streamed table (None where the save was skipped)
+        accepted: Number of leading streamed tables that match the final plan
+        
+    Returns:
+        List[str]: Final paths of the committed CSV files, in table order
+    """
+    committed = []
+    for index, staged_path in enumerate(staged_paths):
+        if not staged_path:
             continue
+        staged_file = Path(staged_path)
+        if index < accepted:
+            final_path = staged_file.with_suffix("")
+            os.replace(staged_file, final_path)
+            committed.append(str(final_path))
+        else:
+            staged_file.unlink(missing_ok=True)
+    return committed
+
+
+class _StreamingTableParser:
+    """
+    Detect complete table objects while the planner response is still streaming.
+    
+    The planner returns {"tables": [{...}, {...}]}. This scanner walks each new
+    chunk exactly once, tracking string/escape state and bracket nesting, and
+    emits every table object as soon as its closing brace arrives, so its CSV can
+    be written while the model is still generating the following tables.
+    """
+
+    def __init__(self):
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escaped = False
+        # Text of the table currently being received; nothing outside a table is retained
+        self._table_parts: Optional[List[str]] = None
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Consume a chunk of response text and return the tables completed by it."""
+        completed = []
+        # Start of the part of this chunk that belongs to the table being received
+        segment_start = 0
+        for index, char in enumerate(chunk):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                # A table is an object opened directly inside the top-level "tables" array
+                if char == "{" and self._stack == ["{", "["]:
+                    self._table_parts = []
+                    segment_start = index
+                self._stack.append(char)
+            elif char in "}]" and self._stack:
+                self._stack.pop()
+                if char == "}" and self._stack == ["{", "["] and self._table_parts is not None:
+                    self._table_parts.append(chunk[segment_start:index + 1])
+                    try:
+                        table = json_codec.loads("".join(self._table_parts))
+                        if isinstance(table, dict):
+                            completed.append(table)
+                    except ValueError:
+                        pass
+                    self._table_parts = None
+        if self._table_parts is not None:
+            self._table_parts.append(chunk[segment_start:])
+        return completed
+
+
+def _balanced_json_objects(text: str) -> Iterator[str]:
+    """
+    Yield each top-level balanced {...} span in text, scanning it in a single pass.
+    
+    Braces inside JSON strings are ignored, so braces in values do not break the
+    match, and prose containing stray braces before the real object is skipped
+    by the caller once its span fails to parse.
+    """
+    depth = 0
+    start = -1
+    in_string = False
+    escaped = False
+    for index, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"' and depth:
+            in_string = True
+        elif char == "{":
+            if depth == 0:
+                start = index
+            depth += 1
+        elif char == "}" and depth:
+            depth -= 1
+            if depth == 0:
+                yield text[start:index + 1]
+
+
+def _parse_plan(response_text: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse the planner response into a plan dictionary.
+    
+    The planner runs in JSON mode, so the whole response normally parses directly;
+    the single-pass object scan is only a defensive fallback for wrapped output.
+    
+    Args:
+        response_text: Full planner response text
         
+    Returns:
+        Optional[Dict[str, Any]]: The parsed plan, or None if no JSON object could be parsed
+    """
+    for candidate in itertools.chain([response_text], _balanced_json_objects(response_text)):
         try:
-            # Convert data_dict to pandas DataFrame for CSV generation
-            # This handles the conversion from nested dictionary to tabular format
-            df = pd.DataFrame(data_dict)
-            
-            # Save DataFrame to CSV file with table name as filename
-            csv_path = output_dir / f"{table_name}.csv"
-            df.to_csv(csv_path, index=False)
-            generated_files.append(str(csv_path))
-            
-            logger.info(f"💾 Saved CSV: {csv_path} with {len(df)} rows and {len(df.columns)} columns")
-            
-        except Exception as e:
-            logger.error(f"❌ Error saving table {table_name}: {e}")
+            plan = json_codec.loads(candidate)
+        except ValueError:
+            continue
+        if isinstance(plan, dict):
+            return plan
+    return None
+
+
+async def _stream_planner_response(inputs: Dict[str, Any], output_dir: Path, streamed_tables: List[Dict[str, Any]], save_futures: List[Future]) -> str:
+    """
+    Stream the planner response and start saving each table as soon as it is complete.
+    
+    Tables are written to staged files (see _commit_streamed_tables). The caller owns
+    the streamed_tables and save_futures lists, so the staged writes can still be
+    committed or cleaned up when the stream fails partway.
+    
+    Args:
+        inputs: Inputs for csv_generation_planner
+        output_dir: Directory path where CSV files will be saved
+        streamed_tables: Filled with every table received complete during streaming
+        save_futures: Filled with the pending staged save of each streamed table
+        
+    Returns:
+        str: Full response text
+    """
+    table_parser = _StreamingTableParser()
+    chunks: List[str] = []
+    # Repeated table names get distinct staged files, so each one is committed exactly once
+    used_stems: Set[str] = set()
     
-    return generated_files
+    async for chunk in csv_generation_planner.astream(inputs):
+        content = chunk.content if hasattr(chunk, "content") else str(chunk)
+        chunks.append(content)
+        for table in table_parser.feed(content):
+            streamed_tables.append(table)
+            file_stem = _unique_file_stem(str(table.get("name", "unknown")), used_stems)
+            save_futures.append(_CSV_WRITE_POOL.submit(_save_table, table, output_dir, file_stem, True))
+    
+    return "".join(chunks)
 
 
-def generate_csv(state: GraphState) -> Dict[str, Any]:
+async def generate_csv(state: GraphState) -> Dict[str, Any]:
     """
     Generate structured tables using LLM, process them, and save as CSV files.
     
@@ -108,7 +406,7 @@ def generate_csv(state: GraphState) -> Dict[str, Any]:
         state: GraphState containing session information and structured JSON paths
         
     Returns:
-        Dict[str, Any]: Updated state with CSV generation results, including:
+        Dict[str, Any]: State update (merged by LangGraph) with CSV generation results, including:
             - csv_generation_status: 'completed', 'skipped', or 'error'
             - csv_generation_message: Human-readable status description
             - generated_tables: AI-generated table structures
@@ -138,7 +436,6 @@ def generate_csv(state: GraphState) -> Dict[str, Any]:
         # Validate that structured JSON data is available for processing
         if not structured_json_paths:
             return {
-                **state,
                 'csv_generation_status': 'skipped',
                 'csv_generation_message': 'No JSON files to process'
             }
@@ -147,101 +444,87 @@ def generate_csv(state: GraphState) -> Dict[str, Any]:
         
         # Step 1: Load all JSON files completely for LLM processing
         # This ensures the AI has access to complete document data for planning
-        all_json_data = []
-        for json_path in structured_json_paths:
-            try:
-                with open(json_path, "r", encoding="utf-8") as f:
-                    json_data = json.load(f)
-                
-                filename = Path(json_path).name
-                all_json_data.append({
-                    "filename": filename,
-                    "data": json_data
-                })
-                logger.info(f"📄 Loaded complete JSON: {filename}")
-                
-            except Exception as e:
-                logger.error(f"❌ Error loading JSON file {json_path}: {e}")
-                continue
+        # Files are read concurrently on worker threads; gather keeps the original order
+        loaded_documents = await asyncio.gather(*(asyncio.to_thread(_load_json_document, json_path) for json_path in structured_json_paths))
+        all_json_data = [document for document in loaded_documents if document is not None]
         
         logger.info(f"📋 Loaded {len(all_json_data)} complete JSON files for LLM")
         
+        # Create the output directory up front so tables can be saved while the plan streams in
+        output_dir = Path(f"assets/csv/{session_id}")
+        output_dir.mkdir(parents=True, exist_ok=True)
+        logger.info(f"💾 Output directory: {output_dir}")
+        
         # Step 2: Get structured tables from LLM with complete data
         # This is the core AI processing step that plans optimal table structures
-        try:
-            logger.info("🤖 Getting structured tables from LLM with complete JSON data...")
-            llm_response = csv_generation_planner.invoke({
-                "documents_inventory": all_json_data
-            })
-            
-            logger.info(f"🤖 Raw LLM response: {llm_response}")
-            logger.info(f"🤖 Response type: {type(llm_response)}")
-            
-            # Parse LLM response with robust error handling
-            # Handle different response formats (AIMessage, string, structured object)
-            if hasattr(llm_response, 'content'):
-                # This is an AIMessage, extract the content for JSON parsing
-                response_content = llm_response.content
-                logger.info(f"🤖 Extracted content from AIMessage: {response_content}")
+        # The response is streamed so each table's CSV is written as soon as the table is complete
+        # Identical inventories (retries, re-runs of the same documents) reuse the cached plan
+        inventory_text = render_inventory(all_json_data)
+        plan_cache_key = response_cache.make_key(PLANNING_MODEL, _SYSTEM_PROMPT, _USER_PROMPT, inventory_text)
+        streamed_tables: List[Dict[str, Any]] = []
+        save_futures: List[Future] = []
+        plan = response_cache.get(plan_cache_key)
+        if plan is not None:
+            logger.info("⚡ Planner cache hit - reusing previous table plan")
+        else:
+            try:
+                logger.info("🤖 Getting structured tables from LLM with complete JSON data...")
+                llm_response = await _stream_planner_response({
+                    "documents_inventory": inventory_text
+                }, output_dir, streamed_tables, save_futures)
                 
-                try:
-                    plan = json.loads(response_content)
-                    logger.info("✅ Successfully parsed JSON from LLM response content")
-                except json.JSONDecodeError as e:
-                    logger.error(f"❌ Failed to parse JSON from LLM response content: {e}")
-                    logger.info("📋 Using fallback plan")
-                    plan = _create_simple_plan(structured_json_paths)
-            elif isinstance(llm_response, str):
-                # Try to extract JSON from string response
-                try:
-                    plan = json.loads(llm_response)
+                logger.debug("🤖 Raw LLM response: %s", llm_response)
+                
+                # Parse the streamed response text into the table plan
+                plan = _parse_plan(llm_response)
+                if plan is not None:
                     logger.info("✅ Successfully parsed JSON from LLM response")
-                except json.JSONDecodeError as e:
-                    logger.error(f"❌ Failed to parse JSON from LLM response: {e}")
+                    response_cache.set(plan_cache_key, plan)
+                else:
+                    logger.error("❌ Failed to parse JSON from LLM response")
                     logger.info("📋 Using fallback plan")
-                    plan = _create_simple_plan(structured_json_paths)
-            else:
-                # Assume structured response (dict, list, etc.)
-                plan = llm_response
-                logger.info("✅ LLM returned structured response")
-            
-            logger.info(f"📋 Final plan: {json.dumps(plan, indent=2)}")
-            
-        except Exception as e:
-            # Comprehensive error handling for LLM processing failures
-            logger.error(f"❌ LLM planning failed: {e}")
-            plan = _create_simple_plan(structured_json_paths)
-            logger.info("📋 Using fallback plan")
+                    plan = _create_fallback_plan(streamed_tables, structured_json_paths)
+                
+                # Pretty-printing the whole plan is only worth its cost when debug logging is on
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("📋 Final plan: %s", json_codec.dumps(plan, option=orjson.OPT_INDENT_2).decode("utf-8"))
+                
+            except Exception as e:
+                # Comprehensive error handling for LLM processing failures
+                logger.error(f"❌ LLM planning failed: {e}")
+                plan = _create_fallback_plan(streamed_tables, structured_json_paths)
+                logger.info("📋 Using fallback plan")
         
         # Step 3: Extract table information from the AI-generated plan
         tables = plan.get("tables", [])
-        logger.info(f"📊 Found {len(tables)} tables to display")
-        
-        # Display processing summary to console
-        print(f"\n🚀 GENERATING STRUCTURED TABLES FOR SESSION: {session_id}")
-        print(f"📁 Processing {len(structured_json_paths)} documents")
-        print(f"📊 LLM generated {len(tables)} tables\n")
+        # The processing summary goes through the module logger (one record) instead of console prints
+        logger.info("🚀 Session %s: LLM planned %d tables from %d documents", session_id, len(tables), len(structured_json_paths))
         
         # Step 4: Save tables to CSV files in organized directory structure
-        output_dir = Path(f"assets/csv/{session_id}")
-        output_dir.mkdir(parents=True, exist_ok=True)
-        logger.info(f"💾 Output directory: {output_dir}")
+        # Tables staged during streaming are committed when they match the final plan and discarded otherwise
+        staged_files = [await asyncio.wrap_future(future) for future in save_futures]
+        already_saved = len(streamed_tables) if tables[:len(streamed_tables)] == streamed_tables else 0
+        generated_files = await asyncio.to_thread(_commit_streamed_tables, staged_files, already_saved)
         
-        # Generate CSV files from the planned table structures
-        generated_files = _save_tables_to_csv(tables, output_dir)
+        # Generate CSV files for the remaining planned table structures
+        # Stems are assigned over the whole plan, so they continue after the committed streamed tables
+        file_stems = _table_file_stems(tables)
+        generated_files += await asyncio.to_thread(_save_tables_to_csv, tables[already_saved:], output_dir, file_stems[already_saved:])
         logger.info(f"💾 Generated {len(generated_files)} CSV files")
         
         # Step 5: Track operations and prepare return results
         
         # Prepare tracking input with complete JSON data for Handit.ai monitoring
         tracking_input = {
-            "systemPrompt": get_system_prompt(),
-            "userPrompt": get_user_prompt(),
+            "systemPrompt": _SYSTEM_PROMPT,
+            "userPrompt": _USER_PROMPT,
             "documents_inventory": all_json_data
         }
         
         # Track the CSV generation operation for observability and debugging
-        tracker.track_node(
+        # Fire-and-forget: the POST runs on the background tracking thread
+        submit_tracking(
+            tracker.track_node,
             input=tracking_input,
             output={"tables": tables, "plan": plan, "generated_files": generated_files},
             node_name="generate_csv",
@@ -254,7 +537,6 @@ def generate_csv(state: GraphState) -> Dict[str, Any]:
         
         # Return comprehensive results including status, tables, and file information
         return {
-            **state,
             'csv_generation_status': 'completed',
             'csv_generation_message': f'Generated and displayed {len(tables)} tables, saved {len(generated_files)} CSV files',
             'generated_tables': tables,
@@ -267,12 +549,24 @@ def generate_csv(state: GraphState) -> Dict[str, Any]:
         # Global error handling for any unexpected failures
         logger.error(f"❌ Table generation failed: {e}")
         return {
-            **state,
             'csv_generation_status': 'error',
             'csv_generation_message': f'Error: {str(e)}'
         }
 
 
+def _create_fallback_plan(streamed_tables: List[Dict[str, Any]], structured_json_paths: List[str]) -> Dict[str, Any]:
+    """
+    Build the plan to use when the full planner response cannot be used.
+    
+    Tables that were already received complete during streaming are valid JSON
+    and are kept; otherwise the simple document overview plan is used.
+    """
+    if streamed_tables:
+        logger.info(f"📋 Salvaged {len(streamed_tables)} complete tables from the streamed response")
+        return {"tables": streamed_tables}
+    return _create_simple_plan(structured_json_paths)
+
+
 def _create_simple_plan(structured_json_paths: List[str]) -> Dict[str, Any]:
     """
     Create a simple fallback plan with basic structure when AI processing fails.
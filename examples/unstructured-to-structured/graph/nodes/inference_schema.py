@@ -10,18 +10,20 @@ then generates a structured JSON schema with field definitions and synonyms.
 """
 
 from typing import Any, Dict, List
-import os
-import base64
 from pathlib import Path
 from langchain_core.messages import HumanMessage
 
-from graph.chains.document_inference import schema_inferencer, get_system_prompt
+from graph.chains import document_inference
+from graph.chains.document_inference import get_system_prompt
+from graph.consts import IMAGE_EXTENSIONS, IMAGE_MIME_TYPES, PDF_EXTENSION
 from graph.state import GraphState
 
-from services.handit_service import tracker
+from services.handit_service import submit_tracking, tracker
+from services.openai_files import get_file_id
+from services.data_url import to_data_url
 
 
-def _build_multimodal_human_message(file_paths: List[str]) -> HumanMessage:
+def _build_multimodal_human_message(file_paths: List[str], data_urls: Dict[str, str]) -> HumanMessage:
     """Build a single HumanMessage with multimodal content covering all documents.
 
     This function creates a comprehensive message that includes:
@@ -33,6 +35,8 @@ def _build_multimodal_human_message(file_paths: List[str]) -> HumanMessage:
 
     Args:
         file_paths: List of file paths to process for schema inference
+        data_urls: Filled with the image data URLs built here, keyed by file path,
+            so later steps reuse them instead of re-reading and re-encoding the images
 
     Returns:
         HumanMessage: A multimodal message containing all document content and instructions
@@ -55,34 +59,39 @@ def _build_multimodal_human_message(file_paths: List[str]) -> HumanMessage:
 
     for file_path in file_paths:
         try:
-            if not os.path.exists(file_path):
-                content.append({"type": "text", "text": f"[MISSING_FILE] {file_path}"})
-                continue
-
             p = Path(file_path)
             ext = p.suffix.lower()
 
+            # Read each document once; a missing file surfaces from the read itself, so no
+            # separate existence check (stat) is made per path. PDFs upload the bytes read here.
+            try:
+                document_bytes = p.read_bytes()
+                file_id = get_file_id(file_path, document_bytes) if ext == PDF_EXTENSION else None
+            except FileNotFoundError:
+                content.append({"type": "text", "text": f"[MISSING_FILE] {file_path}"})
+                continue
+
             content.append({"type": "text", "text": f"[DOCUMENT] {p.name}"})
 
             # Process image files by converting to base64 data URLs
-            if ext in [".png", ".jpg", ".jpeg", ".gif", ".bmp"]:
-                with open(p, "rb") as f:
-                    b = f.read()
-                data_url = f"data:image/{ext[1:]};base64,{base64.b64encode(b).decode('utf-8')}"
+            if ext in IMAGE_EXTENSIONS:
+                data_url = to_data_url(IMAGE_MIME_TYPES[ext], document_bytes)
+                data_urls[file_path] = data_url
                 content.append({"type": "image_url", "image_url": {"url": data_url}})
                 continue
 
-            # Handle PDF files (currently just referenced, could be extended later)
-            if ext == ".pdf":
-                content.append({"type": "text", "text": f"[PDF_FILE] {p.name}"})
+            # Handle PDF files by reference to an uploaded OpenAI file (no base64 in the request)
+            if ext == PDF_EXTENSION:
+                if file_id:
+                    content.append({"type": "file", "file": {"file_id": file_id}})
+                else:
+                    content.append({"type": "text", "text": f"[PDF_FILE] {p.name}"})
                 continue
 
-            # Process text files by reading full content
+            # Process text files using the full decoded content
             try:
-                with open(p, "r", encoding="utf-8") as f:
-                    content_text = f.read()
-                content.append({"type": "text", "text": content_text})
-            except Exception:
+                content.append({"type": "text", "text": document_bytes.decode("utf-8")})
+            except UnicodeDecodeError:
                 content.append({"type": "text", "text": f"[BINARY_FILE] {p.name}"})
 
         except Exception as e:
@@ -109,7 +118,7 @@ def inference_schema(state: GraphState) -> Dict[str, Any]:
         state: GraphState containing session information and document paths
 
     Returns:
-        Dict[str, Any]: Updated state with 'inferred_schema' key containing the generated schema
+        Dict[str, Any]: State update (merged by LangGraph) with 'inferred_schema' key containing the generated schema
 
     Raises:
         Exception: Various exceptions during file processing or LLM invocation
@@ -140,24 +149,25 @@ def inference_schema(state: GraphState) -> Dict[str, Any]:
         if not unstructured_paths:
             print("No documents provided for schema inference")
             return {
-                **state,
                 "inferred_schema": {},
                 "errors": state.get("errors", []) + ["No documents provided for schema inference"],
             }
 
         # Build multimodal message containing all document content
-        human_message = _build_multimodal_human_message(unstructured_paths)
+        # Image data URLs are kept so tracking and data capture reuse them
+        document_data_urls: Dict[str, str] = {}
+        human_message = _build_multimodal_human_message(unstructured_paths, document_data_urls)
         print("Invoking schema inferencer (multimodal)…")
 
         # Invoke the LLM to generate the schema
-        schema_result = schema_inferencer.invoke({"messages": [human_message]})
+        schema_result = document_inference.schema_inferencer.invoke({"messages": [human_message]})
 
         print("Schema inference completed successfully!")
 
         # Process and display the schema result
         print(f"🔍 Schema result: {schema_result}")
         
-        # Return updated state with inferred schema
+        # Return the state update with inferred schema
         # Ensure we store plain JSON in state
         inferred_schema = schema_result.model_dump() if hasattr(schema_result, "model_dump") else schema_result
 
@@ -188,35 +198,17 @@ def inference_schema(state: GraphState) -> Dict[str, Any]:
         }
         
         # Add images as data URLs in the correct format for tracking
-        for file_path in unstructured_paths:
-            try:
-                if not os.path.exists(file_path):
-                    continue
-                    
-                p = Path(file_path)
-                ext = p.suffix.lower()
-                
-                # Only process image files for tracking
-                if ext in [".png", ".jpg", ".jpeg", ".gif", ".bmp"]:
-                    with open(p, "rb") as f:
-                        image_bytes = f.read()
-                    
-                    # Convert to base64 and create data URL (format that Handit.ai expects)
-                    base64_data = base64.b64encode(image_bytes).decode('utf-8')
-                    mime_type = f"image/{ext[1:]}" if ext[1:] != "jpg" else "image/jpeg"
-                    data_url = f"data:{mime_type};base64,{base64_data}"
-                    
-                    tracking_input["images"].append(data_url)
-                    print(f"📸 Added image: {p.name} ({len(data_url)} chars)")
-                    
-            except Exception as e:
-                print(f"❌ Error processing image {file_path}: {str(e)}")
-                continue
+        # The data URLs built for the prompt are reused, so no image is read or encoded twice
+        for file_path, data_url in document_data_urls.items():
+            tracking_input["images"].append(data_url)
+            print(f"📸 Added image: {Path(file_path).name} ({len(data_url)} chars)")
         
         print(f"🖼️ Total images in input: {len(tracking_input['images'])}")
         
         # Track the operation with Handit.ai
-        tracker.track_node(
+        # Fire-and-forget: the POST runs on the background tracking thread
+        submit_tracking(
+            tracker.track_node,
             input=tracking_input,
             output=inferred_schema,
             node_name="inference_schema",
@@ -225,9 +217,9 @@ def inference_schema(state: GraphState) -> Dict[str, Any]:
             execution_id=execution_id,
         )
         
-        # Display final schema result and return updated state
+        # Display final schema result and return the state update
         print(f"🔍 Schema JSON result: {schema_result}")
-        return {**state, "inferred_schema": inferred_schema}
+        return {"inferred_schema": inferred_schema, "document_data_urls": document_data_urls}
 
     except Exception as e:
         # Comprehensive error handling with detailed error messages
@@ -236,7 +228,6 @@ def inference_schema(state: GraphState) -> Dict[str, Any]:
 
         # Return state with error information for debugging
         return {
-            **state,
             "inferred_schema": {},
             "errors": state.get("errors", []) + [error_msg],
         }
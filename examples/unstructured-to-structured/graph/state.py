@@ -13,6 +13,8 @@ class GraphState(TypedDict, total=False):
     - unstructured_paths: List of paths to uploaded unstructured files
     - classification_results: Dictionary containing document classification results
     - inferred_schema: Inferred robust schema derived from the provided documents
+    - document_data_urls: Image data URLs keyed by document path, encoded once during schema
+      inference and reused by data capture (cleared once data capture is done)
     - invoices_paths: List of paths to files classified as invoices
     - structured_json_paths: List of paths to structured JSON files from invoice data extraction
     - csv_content: Generated CSV content as string
@@ -29,6 +31,7 @@ class GraphState(TypedDict, total=False):
     line_items_csv_path: str
     classification_results: Dict[str, Any]
     inferred_schema: Dict[str, Any] 
+    document_data_urls: Dict[str, str]
     invoices_paths: List[str]
     csv_content: str
     csv_path: str
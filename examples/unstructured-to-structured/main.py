@@ -33,10 +33,12 @@ Dependencies:
 - Python standard library for file operations and logging
 """
 
-from fastapi import FastAPI, Request, File, UploadFile, Form
+from fastapi import FastAPI, Request, File, UploadFile, Form, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, BinaryIO
+import asyncio
+import codecs
 import logging
 import datetime
 import time
@@ -44,13 +46,11 @@ import os
 import base64
 from pathlib import Path
 from contextlib import asynccontextmanager
-from dotenv import load_dotenv
 from pprint import pprint
 from graph.graph import app as langgraph_app
-from services.handit_service import tracker
+from graph.consts import BINARY_EXTENSIONS
+from services.handit_service import submit_tracking, tracker
 
-# Load environment variables from .env file
-load_dotenv()
 
 # Configure logging with emojis for better readability
 # This provides structured logging with timestamps and log levels
@@ -64,6 +64,9 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Uploads are streamed to disk in chunks of this size (1 MiB)
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
 def validate_handit_configuration():
     """
     Validate that Handit.ai is properly configured before allowing server startup.
@@ -309,10 +312,108 @@ async def health_check():
     logger.info("✅ Health check completed successfully")
     return response
 
+async def get_workflow_app():
+    """
+    Resolve the compiled LangGraph workflow as a process-wide singleton.
+    
+    Used as a FastAPI dependency so every request shares the same compiled graph
+    and, through its chains, the same OpenAI clients and connection pools instead
+    of building anything per request. The graph is compiled once at import, so this
+    just returns it; being async, FastAPI resolves it on the event loop without a
+    threadpool hop. Tests can swap it via app.dependency_overrides.
+    
+    Returns:
+        The compiled LangGraph application
+    """
+    return langgraph_app
+
+def _write_file(file_path: Path, source: BinaryIO, is_binary: bool) -> None:
+    """
+    Stream an uploaded file to disk in fixed-size chunks (blocking; run in a worker thread).
+    
+    Only one chunk is held in memory at a time, so large uploads never get fully
+    loaded into RAM. Binary files (images, PDFs) are copied as-is; text files are
+    validated as UTF-8 while streaming and rejected if they cannot be decoded.
+    """
+    decoder = None if is_binary else codecs.getincrementaldecoder("utf-8")()
+    try:
+        with open(file_path, "wb") as f:
+            while chunk := source.read(UPLOAD_CHUNK_SIZE):
+                if decoder is not None:
+                    decoder.decode(chunk)
+                f.write(chunk)
+            if decoder is not None:
+                decoder.decode(b"", final=True)
+    except Exception:
+        # Never leave a partially written file behind for the workflow to pick up
+        file_path.unlink(missing_ok=True)
+        raise
+
+def _upload_filenames(files: List[UploadFile]) -> List[str]:
+    """
+    Pick a distinct filename for every uploaded file before they are saved concurrently.
+    
+    Files keep their original name; a name already taken by an earlier file of the
+    same upload is prefixed with the file's position (e.g. "2_report.pdf"), so no
+    two concurrent writes ever target the same path.
+    
+    Args:
+        files: Uploaded files, in upload order
+        
+    Returns:
+        List[str]: Filename for each file, in the same order
+    """
+    used_names = set()
+    filenames = []
+    for index, file in enumerate(files):
+        # Files without a name get a default based on their position
+        filename = file.filename or f"document_{index+1}"
+        if filename in used_names:
+            filename = f"{index+1}_{filename}"
+            while filename in used_names:
+                filename = f"{index+1}_{filename}"
+        used_names.add(filename)
+        filenames.append(filename)
+    return filenames
+
+async def _save_upload(index: int, file: UploadFile, filename: str, session_dir: Path) -> Optional[str]:
+    """
+    Save a single uploaded file into the session directory.
+    
+    Uploads are independent of each other, so the endpoint runs this helper for
+    all files concurrently. The blocking disk write is moved to a worker thread
+    so it never stalls the event loop.
+    
+    Args:
+        index: Position of the file in the upload (used in error messages)
+        file: Uploaded file to save
+        filename: Filename to save under, distinct within the upload (see _upload_filenames)
+        session_dir: Directory where the file will be written
+        
+    Returns:
+        Optional[str]: Full path of the saved file, or None if saving failed
+    """
+    try:
+        file_path = session_dir / filename
+        
+        # Stream file content to disk with validation based on file type
+        is_binary = Path(filename).suffix.lower() in BINARY_EXTENSIONS
+        await asyncio.to_thread(_write_file, file_path, file.file, is_binary)
+        
+        logger.info(f"💾 Saved file: {filename}")
+        return str(file_path)
+        
+    except Exception as e:
+        # Handle individual file processing errors gracefully
+        # This ensures one bad file doesn't break the entire batch
+        logger.error(f"❌ Error saving file {index+1}: {str(e)}")
+        return None
+
 @app.post("/bulk-unstructured-to-structured", response_model=BulkProcessingResponse)
 async def bulk_unstructured_to_structured(
     session_id: str = Form(...),
-    files: List[UploadFile] = File(...)
+    files: List[UploadFile] = File(...),
+    workflow_app = Depends(get_workflow_app)
 ):
     """
     Bulk document processing endpoint for converting unstructured documents to structured format.
@@ -330,6 +431,7 @@ async def bulk_unstructured_to_structured(
     Args:
         session_id: Unique identifier for the processing session
         files: List of uploaded files to be processed
+        workflow_app: Compiled LangGraph workflow (shared singleton dependency)
         
     Returns:
         BulkProcessingResponse: Processing results with status and file information
@@ -348,7 +450,8 @@ async def bulk_unstructured_to_structured(
     # Start tracing with Handit.ai for comprehensive observability
     # This enables monitoring, debugging, and performance analysis
     agent_name = "unstructured_to_structured" # Set agent name for tracing, this is the name of your application
-    tracing_response = tracker.start_tracing(agent_name=agent_name)
+    # The Handit.ai SDK is synchronous, so run it in a worker thread to keep the event loop free
+    tracing_response = await asyncio.to_thread(tracker.start_tracing, agent_name=agent_name)
     execution_id = tracing_response.get("executionId") # Get execution id for tracing
 
     # Validate execution_id is properly received from Handit.ai
@@ -372,51 +475,22 @@ async def bulk_unstructured_to_structured(
         session_dir.mkdir(parents=True, exist_ok=True)
         logger.info(f"📁 Created session directory: {session_dir}")
         
-        # Initialize tracking variables for processing results
-        saved_files = []
-        unstructured_paths = []
+        # Save all uploaded files concurrently
+        # Names are made distinct first, so two uploads never write (or clean up) the same path
+        filenames = _upload_filenames(files)
+        saved_paths = await asyncio.gather(*(
+            _save_upload(i, file, filename, session_dir) for i, (file, filename) in enumerate(zip(files, filenames))
+        ))
         
-        # Process each uploaded file individually
-        # This ensures robust handling of different file types and potential errors
-        for i, file in enumerate(files):
-            try:
-                # Read file content for processing
-                content = await file.read()
-                
-                # Create filename with original extension for proper file identification
-                original_filename = file.filename
-                if not original_filename:
-                    original_filename = f"document_{i+1}"
-                
-                file_path = session_dir / original_filename
-                
-                # Save file content with appropriate encoding based on file type
-                # Binary files (images, PDFs) are saved as-is, text files are decoded
-                if original_filename.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.pdf')):
-                    # Binary files: save raw bytes without encoding
-                    with open(file_path, "wb") as f:
-                        f.write(content)
-                else:
-                    # Text files: decode content and save with UTF-8 encoding
-                    with open(file_path, "w", encoding="utf-8") as f:
-                        f.write(content.decode('utf-8'))
-                
-                # Track successfully saved files and their paths
-                saved_files.append(original_filename)
-                # Add full path to unstructured_paths for LangGraph processing
-                unstructured_paths.append(str(file_path))
-                logger.info(f"💾 Saved file: {original_filename}")
-                
-            except Exception as e:
-                # Handle individual file processing errors gracefully
-                # This ensures one bad file doesn't break the entire batch
-                logger.error(f"❌ Error saving file {i+1}: {str(e)}")
-                 # End tracing
-                tracker.end_tracing(execution_id=execution_id, agent_name= agent_name) # When the workflow has finished, end tracing
+        # Track successfully saved files and their paths
+        # Full paths go to unstructured_paths for LangGraph processing
+        unstructured_paths = [path for path in saved_paths if path is not None]
+        saved_files = [Path(path).name for path in unstructured_paths]
 
         # Invoke LangGraph workflow with complete file information
         # This executes the AI-powered document processing pipeline
-        graph_result = langgraph_app.invoke(input={"session_id": session_id, "unstructured_paths": unstructured_paths, "agent_name": agent_name, "execution_id": execution_id})        
+        # ainvoke yields to the event loop while the LLM calls are in flight, so other requests keep being served
+        graph_result = await workflow_app.ainvoke(input={"session_id": session_id, "unstructured_paths": unstructured_paths, "agent_name": agent_name, "execution_id": execution_id})
         
         # Prepare comprehensive response with processing results
         # This provides users with complete information about their processing job
@@ -432,7 +506,7 @@ async def bulk_unstructured_to_structured(
         logger.info(f"✨ File upload completed successfully - {len(saved_files)} files saved to {session_dir}")
 
         # End tracing to clean up resources and complete the monitoring cycle
-        tracker.end_tracing(execution_id=execution_id, agent_name=agent_name) # When the workflow has finished, end tracing
+        submit_tracking(tracker.end_tracing, execution_id=execution_id, agent_name=agent_name) # When the workflow has finished, end tracing (queued after the node events)
 
         return response
         
@@ -441,7 +515,7 @@ async def bulk_unstructured_to_structured(
         # This ensures graceful error handling and proper resource cleanup
         logger.error(f"💥 Error in file upload: {str(e)}")
         # End tracing
-        tracker.end_tracing(execution_id=execution_id, agent_name=agent_name) # When the workflow has finished, end tracing
+        submit_tracking(tracker.end_tracing, execution_id=execution_id, agent_name=agent_name) # When the workflow has finished, end tracing (queued after the node events)
 
         return BulkProcessingResponse(
             message=f"Error uploading files: {str(e)}",
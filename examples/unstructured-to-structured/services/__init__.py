@@ -0,0 +1,10 @@
+"""
+Service integrations for the document processing pipeline.
+
+Environment variables from .env are loaded here, once per process. Every module
+that reads configuration at import time imports from this package first, either
+directly or through graph.chains._llm, so no other module calls load_dotenv().
+"""
+from dotenv import load_dotenv
+
+load_dotenv()
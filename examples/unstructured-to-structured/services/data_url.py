@@ -0,0 +1,25 @@
+"""
+Data URL encoding for images sent to vision models and Handit.ai tracking.
+
+Images can be several MB, so the data URL is built with as few full-size copies
+as possible: pybase64 (SIMD) encodes straight into a str, and the header is
+joined onto it in a single allocation, so no intermediate base64 bytes object
+or f-string copy is made.
+"""
+from typing import Union
+
+import pybase64
+
+
+def to_data_url(mime_type: str, content: Union[bytes, bytearray, memoryview]) -> str:
+    """
+    Encode raw bytes as a base64 data URL.
+
+    Args:
+        mime_type: MIME type placed in the data URL header (e.g. "image/png")
+        content: Raw file bytes (any bytes-like object, encoded without copying)
+
+    Returns:
+        str: The "data:<mime>;base64,<payload>" URL
+    """
+    return "".join(("data:", mime_type, ";base64,", pybase64.b64encode_as_string(content)))
@@ -0,0 +1,126 @@
+"""
+Deterministic extraction fast path for small "label: value" text documents.
+
+Many small text uploads (exports, receipts, key/value forms) state every field
+of the inferred schema on its own "Label: value" line. For those documents an
+LLM round-trip adds nothing, so this module maps them directly: the schema's
+field names are indexed by normalized label, the document is scanned once with
+a label-agnostic "label: value" line pattern (each line's label resolved by a
+dict lookup), and a result in the extractor's output format is synthesized.
+
+The fast path only answers when every schema field was found with a scalar
+value; any miss returns None and the document continues to the caches and the
+LLM (DIRECT -> cache -> LLM).
+
+Its output replaces the LLM's normalization and reasons with heuristics, so it is
+disabled by default and only used when explicitly enabled.
+
+Configuration (environment variables):
+- DIRECT_EXTRACTION_ENABLED: set to "1" to enable the fast path (default: disabled)
+- DIRECT_EXTRACTION_MAX_CHARS: largest text document handled directly, in characters (default: 16384)
+"""
+import os
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+
+DIRECT_EXTRACTION_ENABLED = os.getenv("DIRECT_EXTRACTION_ENABLED", "0") == "1"
+DIRECT_EXTRACTION_MAX_CHARS = int(os.getenv("DIRECT_EXTRACTION_MAX_CHARS", "16384"))
+
+# Only scalar fields can be read from a single line
+_SCALAR_TYPES = {"string", "number", "integer", "boolean", "null"}
+
+# Any "label: value" / "label = value" line; labels are resolved afterwards with a dict lookup,
+# so the scan stays linear in the document length however many fields the schema has
+_LABEL_LINE = re.compile(r"^[ \t]*(?P<label>[^:=\r\n]+?)[ \t]*[:=][ \t]*(?P<value>[^\r\n]*?)[ \t]*$", re.MULTILINE)
+
+# Date layouts accepted for fields with format "date"
+_DATE_FORMATS = ("%Y-%m-%d", "%Y/%m/%d", "%d/%m/%Y", "%m/%d/%Y", "%d-%m-%Y", "%d.%m.%Y", "%B %d, %Y", "%d %B %Y", "%b %d, %Y")
+
+
+def _label_key(label: str) -> str:
+    """Normalize a label so "Invoice No.", "invoice_no" and "INVOICE-NO" compare equal."""
+    return re.sub(r"[^0-9a-z]+", "", label.lower())
+
+
+def _normalize(value: str, types: List[str], value_format: Optional[str]) -> Any:
+    """Normalize a raw value the way the mapping prompt asks the LLM to."""
+    if value_format == "email":
+        return value.lower()
+    if value_format == "date":
+        for date_format in _DATE_FORMATS:
+            try:
+                return datetime.strptime(value, date_format).date().isoformat()
+            except ValueError:
+                continue
+        return value
+    if "number" in types or "integer" in types or value_format == "currency":
+        numeric = re.sub(r"[^0-9.\-]", "", value.replace(",", ""))
+        try:
+            number = float(numeric)
+        except ValueError:
+            return value
+        return int(number) if "integer" in types and number.is_integer() else number
+    if "boolean" in types and value.lower() in ("true", "false", "yes", "no"):
+        return value.lower() in ("true", "yes")
+    return value
+
+
+class DirectExtractor:
+    """Single-scan "label: value" extractor compiled from one inferred schema."""
+
+    def __init__(self, schema_json: Dict[str, Any]):
+        # (section name, field name, types, format) for every field of the schema
+        self._fields: List[Tuple[str, str, List[str], Optional[str]]] = []
+        # normalized label -> index into self._fields
+        self._labels: Dict[str, int] = {}
+
+        # Specialized sections depend on the document type, which needs the LLM to decide
+        if not DIRECT_EXTRACTION_ENABLED or not isinstance(schema_json, dict) or schema_json.get("specialized_sections"):
+            return
+
+        for section in schema_json.get("common_sections") or []:
+            for field in section.get("fields") or []:
+                types = field.get("types") or ["string"]
+                if not set(types) <= _SCALAR_TYPES:
+                    # Objects and arrays cannot be read from one line; never take the fast path
+                    self._fields = []
+                    return
+                self._labels[_label_key(field["name"])] = len(self._fields)
+                self._fields.append((section["name"], field["name"], types, field.get("format")))
+
+    def extract(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Map a text document to the schema without calling the LLM.
+
+        Args:
+            text: Decoded document text
+
+        Returns:
+            Optional[Dict[str, Any]]: Extraction result in the mapping chain's format,
+            or None when any field is missing and the LLM must handle the document
+        """
+        if not self._fields or len(text) > DIRECT_EXTRACTION_MAX_CHARS:
+            return None
+
+        values: Dict[int, Tuple[str, str]] = {}
+        for match in _LABEL_LINE.finditer(text):
+            index = self._labels.get(_label_key(match.group("label")))
+            value = match.group("value")
+            # Keep the first occurrence of each field, like a reader scanning top-down
+            if index is not None and value and index not in values:
+                values[index] = (match.group("label"), value)
+
+        if len(values) < len(self._fields):
+            return None
+
+        result: Dict[str, Any] = {}
+        for index, (section_name, field_name, types, value_format) in enumerate(self._fields):
+            label, value = values[index]
+            result.setdefault(section_name, {})[field_name] = {
+                "value": value,
+                "normalized_value": _normalize(value, types, value_format),
+                "reason": f"Read from the '{label}' label line of the document",
+            }
+        return result
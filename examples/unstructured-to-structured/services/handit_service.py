@@ -1,12 +1,84 @@
 """
 Handit.ai service initialization and configuration.
+
+Configuration (environment variables):
+- HANDIT_TRACKING_MAX_PENDING: tracking calls queued at most; further calls are dropped (default: 256)
+- HANDIT_TRACKING_TIMEOUT: seconds the queue waits on one tracking call before moving on (default: 10)
 """
+import atexit
+import logging
 import os
-from dotenv import load_dotenv
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
 from handit import HanditTracker
 
-load_dotenv()
+
+TRACKING_MAX_PENDING = int(os.getenv("HANDIT_TRACKING_MAX_PENDING", "256"))
+TRACKING_TIMEOUT = float(os.getenv("HANDIT_TRACKING_TIMEOUT", "10"))
+
+logger = logging.getLogger(__name__)
 
 # Create a singleton tracker instance
 tracker = HanditTracker()
-tracker.config(api_key=os.getenv("HANDIT_API_KEY"))
\ No newline at end of file
+tracker.config(api_key=os.getenv("HANDIT_API_KEY"))
+
+# Tracking calls are network POSTs, so they run on a background thread instead of the request's
+# critical path. A single worker keeps them in submission order, so every node event of an
+# execution reaches Handit.ai before its end_tracing call. Payloads can carry image data URLs,
+# so the queue is bounded: when Handit.ai is slow, new calls are dropped instead of piling up.
+_TRACKING_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="handit-tracking")
+_pending_calls = threading.BoundedSemaphore(TRACKING_MAX_PENDING)
+# Exit never waits for a tracking backlog: queued calls are cancelled, and the call in
+# progress is abandoned after TRACKING_TIMEOUT at the latest
+atexit.register(_TRACKING_POOL.shutdown, wait=False, cancel_futures=True)
+
+
+def _run_tracking_call(call: Callable[..., Any], kwargs: Dict[str, Any]) -> Any:
+    """Run one tracker call, logging failures instead of raising (tracking is best-effort)."""
+    call_name = getattr(call, "__name__", call)
+    outcome: Dict[str, Any] = {}
+
+    def _call() -> None:
+        try:
+            outcome["result"] = call(**kwargs)
+        except Exception as e:
+            logger.error("❌ Handit.ai tracking call %s failed: %s", call_name, e)
+
+    try:
+        # The SDK sends its requests without a timeout, so the call runs on a daemon thread
+        # and the queue moves on after TRACKING_TIMEOUT instead of waiting on it forever
+        caller = threading.Thread(target=_call, name="handit-tracking-call", daemon=True)
+        caller.start()
+        caller.join(TRACKING_TIMEOUT)
+        if caller.is_alive():
+            logger.warning("⚠️ Handit.ai tracking call %s timed out after %ss; continuing", call_name, TRACKING_TIMEOUT)
+            return None
+        return outcome.get("result")
+    finally:
+        _pending_calls.release()
+
+
+def submit_tracking(call: Callable[..., Any], **kwargs: Any) -> Future:
+    """
+    Queue a tracker call (e.g. tracker.track_node, tracker.end_tracing) on the background thread.
+
+    Args:
+        call: Bound tracker method to run
+        **kwargs: Keyword arguments for the call
+
+    Returns:
+        Future: Completes with the call's result (None if it failed, timed out or was dropped
+        because the queue was full); callers normally don't wait on it
+    """
+    if not _pending_calls.acquire(blocking=False):
+        logger.warning("⚠️ Handit.ai tracking queue full (%d pending); dropping %s", TRACKING_MAX_PENDING, getattr(call, "__name__", call))
+        dropped: Future = Future()
+        dropped.set_result(None)
+        return dropped
+    try:
+        return _TRACKING_POOL.submit(_run_tracking_call, call, kwargs)
+    except RuntimeError:
+        # The pool is already shut down (interpreter exit)
+        _pending_calls.release()
+        raise
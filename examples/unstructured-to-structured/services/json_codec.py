@@ -0,0 +1,59 @@
+"""
+JSON decoding and encoding that keeps integers of any size exact.
+
+orjson is used on every hot path, but it decodes integers outside the 64-bit range
+as floats (silently losing digits of long numeric IDs) and refuses to encode them.
+These helpers use orjson whenever that is lossless and fall back to the stdlib json
+module otherwise, so extracted values survive the LLM response, the structured JSON
+files and the planner inventory unchanged.
+"""
+import json
+import re
+from typing import Any, Union
+
+import orjson
+
+
+# Integers that may not fit in 64 bits have at least 19 digits. Digit runs inside strings
+# also match; those documents just take the (exact, slower) stdlib path
+_WIDE_INTEGER = re.compile(r"\d{19,}")
+_WIDE_INTEGER_BYTES = re.compile(rb"\d{19,}")
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    Decode JSON, keeping integers wider than 64 bits exact.
+
+    Args:
+        data: JSON text or UTF-8 bytes
+
+    Returns:
+        Any: The decoded value
+
+    Raises:
+        ValueError: If the data is not valid JSON (orjson.JSONDecodeError or json.JSONDecodeError)
+    """
+    pattern = _WIDE_INTEGER_BYTES if isinstance(data, bytes) else _WIDE_INTEGER
+    if pattern.search(data):
+        return json.loads(data)
+    return orjson.loads(data)
+
+
+def dumps(value: Any, option: int = 0) -> bytes:
+    """
+    Encode a value as UTF-8 JSON with orjson, falling back to json for integers wider than 64 bits.
+
+    Args:
+        value: Value to encode
+        option: orjson options; OPT_INDENT_2 is honoured by the fallback, and non-str
+            keys are always accepted there
+
+    Returns:
+        bytes: The encoded JSON
+    """
+    try:
+        return orjson.dumps(value, option=option)
+    except orjson.JSONEncodeError:
+        indent = 2 if option & orjson.OPT_INDENT_2 else None
+        separators = None if indent else (",", ":")
+        return json.dumps(value, ensure_ascii=False, indent=indent, separators=separators).encode("utf-8")
@@ -0,0 +1,77 @@
+"""
+Exact-match LLM response cache.
+
+Extraction calls run with temperature=0, so the same model, prompt and document
+bytes always produce the same answer. This module keeps those answers in an
+in-process LRU cache with a TTL so re-uploads and retries within a worker skip
+the LLM round-trip entirely.
+
+Configuration (environment variables):
+- LLM_CACHE_ENABLED: set to "0" to disable caching (default: enabled)
+- LLM_CACHE_MAXSIZE: maximum number of cached responses (default: 1024)
+- LLM_CACHE_TTL: seconds before a cached response expires (default: 3600)
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Union
+
+
+class ResponseCache:
+    """Thread-safe LRU cache with per-entry expiry for LLM responses."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600.0, enabled: bool = True):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(*parts: Union[str, bytes, None]) -> str:
+        """Build a sha256 cache key from the parts that determine the LLM response."""
+        digest = hashlib.sha256()
+        for part in parts:
+            if part is None:
+                part = b""
+            elif isinstance(part, str):
+                part = part.encode("utf-8")
+            # Length-prefix each part so ("ab", "c") and ("a", "bc") never collide
+            digest.update(len(part).to_bytes(8, "big"))
+            digest.update(part)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached response for key, or None on miss/expiry."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a response, evicting the least recently used entry when full."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+# Create a singleton cache instance shared by all nodes in the process
+response_cache = ResponseCache(
+    maxsize=int(os.getenv("LLM_CACHE_MAXSIZE", "1024")),
+    ttl=float(os.getenv("LLM_CACHE_TTL", "3600")),
+    enabled=os.getenv("LLM_CACHE_ENABLED", "1") != "0",
+)
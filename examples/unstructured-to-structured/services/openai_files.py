@@ -0,0 +1,127 @@
+"""
+OpenAI Files API integration for document uploads.
+
+Chat Completions accepts PDF documents by file ID, so a PDF is uploaded once and
+then referenced from every prompt that needs it (schema inference and data
+capture) instead of being base64-expanded into each request body. File IDs are
+cached by content hash, so re-uploads of the same bytes reuse the existing file.
+
+Only identical uploads wait on each other: each content hash has its own pending
+upload, so different PDFs upload concurrently. The cache is bounded (LRU size and
+TTL); files that fall out of it are deleted from OpenAI in the background, so the
+size should stay well above the number of PDFs processed at once.
+
+Configuration (environment variables):
+- OPENAI_FILES_ENABLED: set to "0" to disable uploads (PDFs fall back to a name marker)
+- OPENAI_FILES_MAX_CACHED: maximum uploaded files kept and reused (default: 256)
+- OPENAI_FILES_TTL: seconds an uploaded file is reused before it is deleted (default: 3600)
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from openai import OpenAI
+
+from services.openai_http import http_client
+
+
+FILES_ENABLED = os.getenv("OPENAI_FILES_ENABLED", "1") != "0"
+FILES_MAX_CACHED = int(os.getenv("OPENAI_FILES_MAX_CACHED", "256"))
+FILES_TTL = float(os.getenv("OPENAI_FILES_TTL", "3600"))
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[OpenAI] = None
+# content hash -> (expires_at, upload future resolving to the file ID), least recently used first
+_uploads: "OrderedDict[str, Tuple[float, Future]]" = OrderedDict()
+# Guards _uploads only; never held across a network call
+_lock = threading.Lock()
+# Deletes files evicted from the cache without delaying the caller that evicted them
+_DELETE_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="openai-files-delete")
+
+
+def _get_client() -> OpenAI:
+    """Create the OpenAI client on first use so importing this module stays cheap."""
+    global _client
+    if _client is None:
+        _client = OpenAI(http_client=http_client)
+    return _client
+
+
+def _delete_file(file_id: str) -> None:
+    """Delete an evicted file from OpenAI; failures are logged, never raised."""
+    try:
+        _get_client().files.delete(file_id)
+    except Exception as e:
+        logger.warning("⚠️ Could not delete OpenAI file %s: %s", file_id, e)
+
+
+def _discard(upload: Future) -> None:
+    """Delete the file of an evicted upload in the background, once the upload has finished."""
+    def _delete_when_uploaded(finished: Future) -> None:
+        if finished.exception() is None:
+            _DELETE_POOL.submit(_delete_file, finished.result())
+    upload.add_done_callback(_delete_when_uploaded)
+
+
+def get_file_id(file_path: str, content: Optional[bytes] = None, mime_type: str = "application/pdf") -> Optional[str]:
+    """
+    Upload a document to the OpenAI Files API and return its file ID.
+
+    Args:
+        file_path: Path of the document to upload (its name is sent with the upload)
+        content: Document bytes, when the caller already read them (default: read from file_path)
+        mime_type: MIME type sent with the upload
+
+    Returns:
+        Optional[str]: The file ID, or None if uploads are disabled
+    """
+    if not FILES_ENABLED:
+        return None
+
+    path = Path(file_path)
+    if content is None:
+        content = path.read_bytes()
+    digest = hashlib.sha256(content).hexdigest()
+
+    now = time.monotonic()
+    evicted: List[Future] = []
+    with _lock:
+        entry = _uploads.get(digest)
+        if entry is not None and entry[0] < now:
+            # Expired: upload again under a fresh entry and delete the old file
+            del _uploads[digest]
+            evicted.append(entry[1])
+            entry = None
+        if entry is not None:
+            _uploads.move_to_end(digest)
+            upload, is_owner = entry[1], False
+        else:
+            upload, is_owner = Future(), True
+            _uploads[digest] = (now + FILES_TTL, upload)
+            while len(_uploads) > FILES_MAX_CACHED:
+                _, (_, oldest) = _uploads.popitem(last=False)
+                evicted.append(oldest)
+
+    for old_upload in evicted:
+        _discard(old_upload)
+
+    if is_owner:
+        # The upload runs outside the lock; identical documents wait on this future instead
+        try:
+            uploaded = _get_client().files.create(file=(path.name, content, mime_type), purpose="user_data")
+        except Exception as e:
+            with _lock:
+                if digest in _uploads and _uploads[digest][1] is upload:
+                    del _uploads[digest]
+            upload.set_exception(e)
+            raise
+        upload.set_result(uploaded.id)
+
+    return upload.result()
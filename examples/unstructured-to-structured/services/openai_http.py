@@ -0,0 +1,45 @@
+"""
+Shared HTTP clients for every OpenAI call in the process.
+
+Each ChatOpenAI / OpenAI / OpenAIEmbeddings instance would otherwise open its own
+connection pool, so concurrent calls from different chains redo TCP and TLS
+handshakes and are capped by small per-client pools. All clients in this package
+reuse the two pools defined here (sync and async), with a large keep-alive pool
+and HTTP/2 when the optional `h2` package is installed (`httpx[http2]`), so
+concurrent requests multiplex over a few long-lived connections.
+
+Configuration (environment variables):
+- OPENAI_HTTP2: set to "0" to force HTTP/1.1 (default: HTTP/2 when available)
+- OPENAI_HTTP_MAX_CONNECTIONS: maximum open connections per pool (default: 200)
+- OPENAI_HTTP_MAX_KEEPALIVE: idle connections kept open per pool (default: 100)
+- OPENAI_HTTP_TIMEOUT: request timeout in seconds (default: 60)
+"""
+import os
+
+import httpx
+
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 support in httpx
+    _H2_AVAILABLE = True
+except ImportError:
+    _H2_AVAILABLE = False
+
+HTTP2_ENABLED = _H2_AVAILABLE and os.getenv("OPENAI_HTTP2", "1") != "0"
+
+_limits = httpx.Limits(
+    max_connections=int(os.getenv("OPENAI_HTTP_MAX_CONNECTIONS", "200")),
+    max_keepalive_connections=int(os.getenv("OPENAI_HTTP_MAX_KEEPALIVE", "100")),
+    keepalive_expiry=300,
+)
+_timeout = httpx.Timeout(float(os.getenv("OPENAI_HTTP_TIMEOUT", "60")))
+
+# Connection-level retries only (connect errors); request-level retries stay with the OpenAI SDK
+http_client = httpx.Client(
+    transport=httpx.HTTPTransport(retries=2, http2=HTTP2_ENABLED, limits=_limits),
+    timeout=_timeout,
+)
+http_async_client = httpx.AsyncClient(
+    transport=httpx.AsyncHTTPTransport(retries=2, http2=HTTP2_ENABLED, limits=_limits),
+    timeout=_timeout,
+)
@@ -0,0 +1,113 @@
+"""
+Semantic LLM response cache for near-duplicate text documents.
+
+Documents generated from the same template (e.g. invoices from one vendor) often
+produce almost identical extraction prompts that an exact-match cache misses.
+This cache embeds the first few KB of a document's text and returns a stored
+extraction result when a previous document is similar enough.
+
+Near-duplicates can still differ in the values being extracted, so the cache is
+disabled by default and uses a conservative similarity threshold.
+
+Configuration (environment variables):
+- SEMANTIC_CACHE_ENABLED: set to "1" to enable the cache (default: disabled)
+- SEMANTIC_CACHE_THRESHOLD: minimum cosine similarity for a hit (default: 0.97)
+- SEMANTIC_CACHE_TTL: seconds before a cached response expires (default: 86400)
+- SEMANTIC_CACHE_MAX_ENTRIES: maximum entries per namespace (default: 1024)
+- EMBEDDING_MODEL: OpenAI embedding model (default: text-embedding-3-small)
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_openai import OpenAIEmbeddings
+
+from services.openai_http import http_async_client, http_client
+
+
+# Only the beginning of a document is embedded; templates diverge early if at all
+EMBED_PREFIX_CHARS = 4096
+
+
+class SemanticCache:
+    """In-process cosine-similarity cache of LLM responses, partitioned by namespace."""
+
+    def __init__(
+        self,
+        threshold: float = 0.97,
+        ttl: float = 86400.0,
+        max_entries: int = 1024,
+        embedding_model: str = "text-embedding-3-small",
+        enabled: bool = False,
+    ):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.embedding_model = embedding_model
+        self.enabled = enabled
+        self._embeddings: Optional[OpenAIEmbeddings] = None
+        # namespace -> list of (expires_at, unit vector, response)
+        self._entries: Dict[str, List[Tuple[float, np.ndarray, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def _embed(self, text: str) -> np.ndarray:
+        """Embed the document prefix and normalize it to a unit vector."""
+        if self._embeddings is None:
+            # The embedded prefix is far below the model's context length, so token-based
+            # chunking is skipped and no tiktoken encoding is ever loaded for embeddings
+            self._embeddings = OpenAIEmbeddings(
+                model=self.embedding_model,
+                check_embedding_ctx_length=False,
+                http_client=http_client,
+                http_async_client=http_async_client,
+            )
+        vector = np.asarray(self._embeddings.embed_query(text[:EMBED_PREFIX_CHARS]), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, namespace: str, text: str) -> Tuple[Optional[Any], Optional[np.ndarray]]:
+        """
+        Find a cached response for a near-duplicate document.
+
+        Returns:
+            Tuple of (cached response or None, embedding). Pass the embedding to
+            store() on a miss to avoid embedding the document twice.
+        """
+        if not self.enabled or not text.strip():
+            return None, None
+
+        vector = self._embed(text)
+        now = time.monotonic()
+        with self._lock:
+            entries = [entry for entry in self._entries.get(namespace, []) if entry[0] >= now]
+            self._entries[namespace] = entries
+            if not entries:
+                return None, vector
+            matrix = np.stack([entry[1] for entry in entries])
+            similarities = matrix @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.threshold:
+                return entries[best][2], vector
+        return None, vector
+
+    def store(self, namespace: str, vector: Optional[np.ndarray], response: Any) -> None:
+        """Store a response under the embedding returned by lookup()."""
+        if not self.enabled or vector is None:
+            return
+        with self._lock:
+            entries = self._entries.setdefault(namespace, [])
+            entries.append((time.monotonic() + self.ttl, vector, response))
+            if len(entries) > self.max_entries:
+                del entries[: len(entries) - self.max_entries]
+
+
+# Create a singleton cache instance shared by all nodes in the process
+semantic_cache = SemanticCache(
+    threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.97")),
+    ttl=float(os.getenv("SEMANTIC_CACHE_TTL", "86400")),
+    max_entries=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1024")),
+    embedding_model=os.getenv("EMBEDDING_MODEL", "text-embedding-3-small"),
+    enabled=os.getenv("SEMANTIC_CACHE_ENABLED", "0") == "1",
+)